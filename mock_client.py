@@ -1,5 +1,4 @@
 # mock_client.py
-import time
 import threading
 
 from presentation_clicker_client.mqtt_client import PresentationMqttClient
@@ -13,6 +12,7 @@ class MockClient:
         self.sequence = sequence
         self.delay = delay
         self.initial_delay = initial_delay
+        self._done = threading.Event()
         self.client.on_connect = self.on_connect
         self.client.on_disconnect = self.on_disconnect
         self.client.on_message = self.on_message
@@ -24,31 +24,32 @@ class MockClient:
         def send_sequence():
             if self.initial_delay > 0:
                 print(f"[MockClient] Waiting initial delay: {self.initial_delay} seconds")
-                time.sleep(self.initial_delay)
+                if self._done.wait(self.initial_delay):
+                    return
             for action in self.sequence:
                 print(f"[MockClient] Sending action: {action}")
                 self.client.publish_action(action)
-                time.sleep(self.delay)
+                if self._done.wait(self.delay):
+                    return
             print("[MockClient] Sequence complete. Disconnecting...")
             self.client.disconnect()
         threading.Thread(target=send_sequence, daemon=True).start()
 
     def on_disconnect(self):
         print(f"[MockClient] Disconnected.")
-        self._running = False
+        self._done.set()
 
     def on_message(self, topic, payload):
         print(f"[MockClient] Received: {topic}: {payload}")
 
-    def on_publish(self, topic, payload):
-        print(f"[MockClient] Published: {topic}: {payload}")
+    def on_publish(self, topic, event):
+        print(f"[MockClient] Published: {topic}: {event.kind} '{event.payload}' from '{event.user}'")
 
     def run(self):
         try:
-            self._running = True
+            self._done.clear()
             self.client.connect(self.user, self.room, self.pwd)
-            while self._running and getattr(self.client, 'connected', False):
-                time.sleep(0.1)
+            self._done.wait()
         except Exception as e:
             print(f"[MockClient] Connection failed: {e}")
 
@@ -5,8 +5,6 @@ Provides subcommands for running client or server components.
 """
 import argparse
 import sys
-from .client import client_main
-from .server import server_main
 
 
 def main():
@@ -55,51 +53,18 @@ def main():
         parser.print_help()
         return 1
     
-    # Route to appropriate function
+    # Pass the already parsed options straight to the selected component
+    overrides = {k: v for k, v in vars(args).items() if v is not None and k != 'command'}
+    
+    # Route to appropriate function (imported on demand, so e.g. the client
+    # does not load the server's keyboard hooks and vice versa)
     try:
         if args.command == 'client':
-            # Set sys.argv for the client main function to parse
-            original_argv = sys.argv.copy()
-            sys.argv = ['presentation-clicker-client']
-            if args.host:
-                sys.argv.extend(['--host', args.host])
-            if args.port:
-                sys.argv.extend(['--port', str(args.port)])
-            if args.keepalive:
-                sys.argv.extend(['--keepalive', str(args.keepalive)])
-            if args.open_config_dir:
-                sys.argv.append('--open-config-dir')
-            if args.transport:
-                sys.argv.extend(['--transport', args.transport])
-            if args.theme:
-                sys.argv.extend(['--theme', args.theme])
-            
-            try:
-                return client_main()
-            finally:
-                sys.argv = original_argv
-                
+            from .client import client_main
+            return client_main(overrides=overrides)
         elif args.command == 'server':
-            # Set sys.argv for the server main function to parse
-            original_argv = sys.argv.copy()
-            sys.argv = ['presentation-clicker-server']
-            if args.host:
-                sys.argv.extend(['--host', args.host])
-            if args.port:
-                sys.argv.extend(['--port', str(args.port)])
-            if args.keepalive:
-                sys.argv.extend(['--keepalive', str(args.keepalive)])
-            if args.open_config_dir:
-                sys.argv.append('--open-config-dir')
-            if args.transport:
-                sys.argv.extend(['--transport', args.transport])
-            if args.theme:
-                sys.argv.extend(['--theme', args.theme])
-            
-            try:
-                return server_main()
-            finally:
-                sys.argv = original_argv
+            from .server import server_main
+            return server_main(overrides=overrides)
     except KeyboardInterrupt:
         print("\nInterrupted by user")
         return 1
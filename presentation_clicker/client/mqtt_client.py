@@ -3,23 +3,44 @@ mqtt_client.py
 Presentation Clicker MQTT Client logic for secure, robust communication with server via MQTT.
 Handles encryption, reconnect, connection timeout, and UI callbacks.
 """
-import json
 import os
-import time
-from typing import Callable
+import socket
+import uuid
+from typing import Callable, NamedTuple, Optional
 
 import paho.mqtt.client as mqtt
 
-from ..common import BaseMqttHandler
+from ..common import BaseMqttHandler, DECRYPT_ERRORS, json_loads, json_dumps, as_text
 
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), 'mqtt_config.yaml')
 
+# Actions sent by the UI, pre-rendered per user in _prepare_payloads
+ACTIONS = ("next", "previous", "start", "end", "blackout")
+
+
+class LogEvent(NamedTuple):
+    """
+    Incoming message, parsed and classified on the MQTT network thread.
+    kind: 'status', 'action', 'malformed_status', 'malformed_action', 'malformed' or 'other'.
+    user: Sending user (only set for 'status' and 'action').
+    payload: Status/action value, or the raw message text for all other kinds.
+    """
+    kind: str
+    user: Optional[str]
+    payload: str
+
 
 class PresentationMqttClient(BaseMqttHandler):
     """
     MQTT client for Presentation Clicker system.
     Handles encrypted communication, reconnect logic, and UI callbacks.
     """
+    __slots__ = (
+        "on_publish", "user", "presentation_topic", "status_topic",
+        "_action_prefix", "_action_suffix", "_action_payloads", "_status_cache",
+        "_encrypt", "_publish",
+    )
+    
     def __init__(self, config_path: str = CONFIG_FILE):
         """
         Initialize the MQTT client state and set default callbacks.
@@ -28,9 +49,33 @@ class PresentationMqttClient(BaseMqttHandler):
         """
         super().__init__(config_path)
         # Additional client-specific callback
-        self.on_publish: Callable[[str, str], None] = lambda topic, payload: None
+        # Receives every message we publish as a LogEvent ('action' or 'status'),
+        # built from the known values, so nothing is parsed back per click
+        self.on_publish: Callable[[str, LogEvent], None] = lambda topic, event: None
         # Client-specific state
         self.user = None
+        self.presentation_topic = None
+        self.status_topic = None
+        # Pre-rendered payloads (built in connect() once the user is known)
+        self._action_prefix: bytes = b""
+        self._action_suffix: bytes = b"}"
+        self._action_payloads: dict = {}
+        self._status_cache: dict = {}
+        # Bound encrypt method for the publish hot path (set by _setup_encryption)
+        self._encrypt: Optional[Callable[[bytes], bytes]] = None
+
+    def _create_client(self, client_id: str = "", clean_session: bool = True) -> None:
+        """
+        Create the paho client and bind the client-specific callbacks.
+        Args:
+            client_id: MQTT client id (empty for a broker-assigned one).
+            clean_session: False to let the broker keep the session between connects.
+        """
+        super()._create_client(client_id, clean_session)
+        # Tune the socket as soon as paho opens it
+        self.client.on_socket_open = self._on_socket_open
+        # Bound publish method for the hot path
+        self._publish = self.client.publish
 
     def connect(self, user: str, room: str, pwd: str, timeout: int = 5):
         """
@@ -42,18 +87,35 @@ class PresentationMqttClient(BaseMqttHandler):
             timeout: Connection timeout in seconds.
         Raises:
             TimeoutError: If connection is not established within timeout.
+            RuntimeError: If already connected.
         """
+        # Don't touch the topics, keys or client of a live session
+        self._check_not_connected()
         # Store connection parameters
-        self.room = room
+        self._set_room(room)
         self.user = user
-        self.base_topic = self._get_base_topic()
+        self.presentation_topic = f"{self.base_topic}/presentation"
+        self.status_topic = f"{self.base_topic}/status"
         self._setup_encryption(pwd)
         
-        # Set Last Will on status topic (connection lost)
-        will_topic = f"{self.base_topic}/status"
-        will_payload = {"user": user, "status": "connection_lost"}
-        encrypted_will = self.fernet.encrypt(json.dumps(will_payload).encode()).decode()
-        self.client.will_set(will_topic, encrypted_will, qos=1, retain=True)
+        # Opt-in (persistent_session in the config): a persistent session per
+        # machine, room and user, so the broker keeps our subscription and
+        # reconnects can skip resubscribing. Off by default, since two windows
+        # with the same user on one machine would share the id and keep
+        # kicking each other off the broker.
+        if self.config.get("persistent_session", False):
+            client_id = self._session_client_id()
+            if client_id != self._client_id:
+                self._create_client(client_id, clean_session=False)
+        
+        # Pre-render the per-user payloads (will, status and action prefix)
+        self._prepare_payloads()
+        
+        # Set Last Will on status topic (connection lost). The will travels in
+        # the CONNECT packet and is only published if we drop off, so the
+        # retained "online" from _on_connect is the only write per session;
+        # keep the will retained so it replaces that "online" after a crash.
+        self.client.will_set(self.status_topic, self._status_cache["connection_lost"], qos=1, retain=True)
         
         # Connect to broker
         self._connect_to_broker(timeout)
@@ -64,40 +126,147 @@ class PresentationMqttClient(BaseMqttHandler):
         """
         # Send offline status before disconnecting (graceful disconnect)
         if self.connected:
-            self.publish_status("offline")
-            time.sleep(0.5)
+            info = self.publish_status("offline")
+            try:
+                # Returns as soon as the broker acknowledged the message
+                info.wait_for_publish(timeout=1.0)
+            except (RuntimeError, ValueError):
+                pass  # Not queued (e.g. connection already gone)
         super().disconnect()
 
+    def _setup_encryption(self, pwd: str) -> None:
+        """
+        Setup encryption using the room password and bind the encrypt method.
+        Invariant: self._encrypt must always belong to the current self.fernet,
+        so any code replacing the Fernet instance has to go through here.
+        Args:
+            pwd: Room password for encryption key derivation.
+        """
+        super()._setup_encryption(pwd)
+        self._encrypt = self.fernet.encrypt
+
+    def _session_client_id(self) -> str:
+        """
+        Return a stable MQTT client id for this machine, room and user.
+        """
+        key = f"{uuid.getnode()}/{self.room}/{self.user}"
+        return f"pc-{uuid.uuid5(uuid.NAMESPACE_URL, key).hex[:20]}"
+
+    def _prepare_payloads(self) -> None:
+        """
+        Pre-render the JSON payloads that only depend on the current user.
+        The known actions are rendered up front (other actions reuse the
+        JSON prefix). Only the plain text is cached for actions, since
+        every click needs a fresh Fernet token. The status messages
+        (including the last will) are encrypted once and cached.
+        """
+        self._action_prefix = b'{"user":' + json_dumps(self.user) + b',"action":'
+        self._action_payloads = {
+            action: self._action_prefix + json_dumps(action) + self._action_suffix
+            for action in ACTIONS
+        }
+        self._status_cache = {
+            status: self._encrypt(json_dumps({"user": self.user, "status": status}))
+            for status in ("online", "offline", "connection_lost")
+        }
+
     def publish_action(self, action: str):
         """
         Publish a presentation action to the server.
         Args:
             action: Action string (e.g., 'next', 'previous', 'start', etc.)
         """
-        topic = f"{self.base_topic}/presentation"
-        payload = {"user": self.user, "action": action}
-        self.publish_encrypted(topic, payload, qos=1)
+        topic = self.presentation_topic
+        payload = self._action_payloads.get(action)
+        if payload is None:
+            payload = self._action_prefix + json_dumps(action) + self._action_suffix
+        self._publish(topic, self._encrypt(payload), qos=1)
         # Call publish callback for UI
-        self.on_publish(topic, json.dumps(payload))
+        self.on_publish(topic, LogEvent("action", self.user, action))
 
-    def publish_status(self, status: str):
+    def publish_status(self, status: str) -> mqtt.MQTTMessageInfo:
         """
         Publish the user's status (online/offline) to the server.
         Args:
             status: Status string ('online' or 'offline').
+        Returns:
+            MQTTMessageInfo: Paho publish info (e.g. for wait_for_publish).
         """
-        topic = f"{self.base_topic}/status"
-        payload = {"user": self.user, "status": status}
-        self.publish_encrypted(topic, payload, qos=1, retain=True)
+        topic = self.status_topic
+        encrypted = self._status_cache.get(status)
+        if encrypted is None:
+            encrypted = self._encrypt(json_dumps({"user": self.user, "status": status}))
+        info = self._publish(topic, encrypted, qos=1, retain=True)
         # Call publish callback for UI
-        self.on_publish(topic, json.dumps(payload))
+        self.on_publish(topic, LogEvent("status", self.user, status))
+        return info
 
     # ─── Internal MQTT Callbacks ────────────────────────────────
     
-    def _on_connect_handler(self, client: mqtt.Client, userdata, flags, rc) -> None:
+    def _on_socket_open(self, client: mqtt.Client, userdata, sock) -> None:
+        """
+        Internal callback for the MQTT socket being opened.
+        Disables Nagle's algorithm so small click messages are sent immediately.
+        """
+        # The websockets transport wraps the underlying TCP socket
+        raw_sock = getattr(sock, "_socket", sock)
+        try:
+            raw_sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            raw_sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        except (OSError, AttributeError):
+            pass  # Not a TCP socket, keep the defaults
+
+    def _on_message(self, client: mqtt.Client, userdata, msg) -> None:
+        """
+        Internal callback for MQTT message event.
+        Decrypts, parses and classifies the message on the network thread
+        and passes the resulting LogEvent to the UI callback.
+        Never raises: paho re-raises callback exceptions, which would stop the
+        network thread (and with it all reconnects).
+        """
+        try:
+            try:
+                decrypted = self._decrypt(msg.payload)
+            except DECRYPT_ERRORS as e:
+                self.on_message(msg.topic, LogEvent("malformed", None, f"[Decryption failed: {e}]"))
+                return
+            self.on_message(msg.topic, self._classify_message(msg.topic, decrypted))
+        except Exception as e:
+            print(f"[MQTT] Error handling message on {msg.topic}: {e!r}")
+
+    def _classify_message(self, topic: str, payload: bytes) -> LogEvent:
+        """
+        Parse a decrypted payload and classify it by topic.
+        Args:
+            topic: MQTT topic the message arrived on.
+            payload: Decrypted JSON payload.
+        Returns:
+            LogEvent: Classified message.
+        """
+        try:
+            data = json_loads(payload)
+            if topic == self.status_topic:
+                user = data.get("user")
+                status = data.get("status")
+                if user and status:
+                    return LogEvent("status", user, status)
+                return LogEvent("malformed_status", None, as_text(payload))
+            if topic == self.presentation_topic:
+                user = data.get("user")
+                action = data.get("action")
+                if user and action:
+                    return LogEvent("action", user, action)
+                return LogEvent("malformed_action", None, as_text(payload))
+            return LogEvent("other", None, as_text(payload))
+        except Exception:
+            return LogEvent("malformed", None, as_text(payload))
+
+    def _on_connect_handler(self, client: mqtt.Client, userdata, flags: mqtt.ConnectFlags, reason_code) -> None:
         """
         Client-specific connection handler.
-        Subscribes to room topics and publishes online status.
+        Subscribes to room topics (unless the broker resumed our session,
+        which still holds the subscription) and publishes online status.
         """
-        client.subscribe(f"{self.base_topic}/#")
+        if not flags.session_present:
+            client.subscribe(self._sub_filter)
         self.publish_status("online")
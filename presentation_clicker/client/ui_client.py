@@ -3,8 +3,7 @@ ui_client.py
 Presentation Clicker Client UI using Tkinter and ttkbootstrap.
 Provides a user interface for connecting to the server, sending navigation commands, and viewing logs.
 """
-import datetime
-import json
+import functools
 import os
 import tkinter as tk
 from tkinter import ttk
@@ -12,17 +11,52 @@ from typing import Optional
 
 from ttkbootstrap import Style
 from ttkbootstrap.constants import PRIMARY, SUCCESS, DANGER
-from .mqtt_client import PresentationMqttClient
+from .mqtt_client import PresentationMqttClient, LogEvent
 from ..common import (
     BaseApp, create_main_function, get_misc_icons, UILogger
 )
 
+# Log formats for sent messages, keyed by LogEvent kind
+_SENT_FORMATS = {
+    "action": "Sent action '%s' from '%s'.",
+    "status": "Sent status update for user '%s'.",
+}
+
+# Log formats for received messages, keyed by LogEvent kind
+_RECEIVED_FORMATS = {
+    "status": "User '%s' is now %s.",
+    "action": "Action '%s' from '%s' received.",
+    "malformed_status": "Malformed status message: %s",
+    "malformed_action": "Malformed action message: %s",
+    "malformed": "Malformed message: %s",
+    "other": "[RCV] %s: %s",
+}
+
+# Tcl proc behind the paste buttons: replaces the entry's text with the
+# clipboard, leaving it untouched when the clipboard is empty or unavailable
+_PASTE_PROC = (
+    "proc clicker_paste {w} {"
+    " if {![catch {clipboard get} clip]} { $w delete 0 end; $w insert 0 $clip }"
+    " }"
+)
+
 
 class PresentationClickerApp(BaseApp):
     """
     Presentation Clicker Client UI application.
     Handles user input, MQTT communication, and log display.
     """
+    
+    # Navigation buttons as (attribute, icon name, action sent on click)
+    NAV_BUTTONS = (
+        ("btn_prev", "prev", "previous"),
+        ("btn_next", "next", "next"),
+        ("btn_start", "start", "start"),
+        ("btn_end", "end", "end"),
+        ("btn_blackout", "blackout", "blackout"),
+    )
+    NAV_BUTTON_KW = {"bootstyle": "info", "width": 4, "state": tk.DISABLED, "style": "Icon.TButton"}
+
     def __init__(self, mqtt_client: Optional[PresentationMqttClient] = None, theme: str = "flatly", config_path: str = None) -> None:
         """
         Initialize the UI, MQTT client, and callbacks.
@@ -68,15 +102,17 @@ class PresentationClickerApp(BaseApp):
         )
         # get misc icons for buttons
         misc_icons = get_misc_icons()
+        # Paste buttons run clicker_paste as a Tcl command, without a Python callback
+        self.root.tk.eval(_PASTE_PROC)
         # Connection inputs
         self.lbl_name: ttk.Label = ttk.Label(self.frm_connect, text="Display Name:")
         self.ent_name: ttk.Entry = ttk.Entry(self.frm_connect, width=26)
         self.lbl_room: ttk.Label = ttk.Label(self.frm_connect, text="Room Code:")
         self.ent_room: ttk.Entry = ttk.Entry(self.frm_connect, width=15)
-        self.btn_paste_room: ttk.Button = ttk.Button(self.frm_connect, text=misc_icons['paste'], width=4, style="Icon.TButton", command=lambda: self._paste_to_entry(self.ent_room))
+        self.btn_paste_room: ttk.Button = ttk.Button(self.frm_connect, text=misc_icons['paste'], width=4, style="Icon.TButton", command=f"clicker_paste {self.ent_room}")
         self.lbl_pwd: ttk.Label  = ttk.Label(self.frm_connect, text="Password:")
         self.ent_pwd: ttk.Entry  = ttk.Entry(self.frm_connect, width=15, show="*")
-        self.btn_paste_pwd: ttk.Button = ttk.Button(self.frm_connect, text=misc_icons['paste'], width=4, style="Icon.TButton", command=lambda: self._paste_to_entry(self.ent_pwd))
+        self.btn_paste_pwd: ttk.Button = ttk.Button(self.frm_connect, text=misc_icons['paste'], width=4, style="Icon.TButton", command=f"clicker_paste {self.ent_pwd}")
         # Connect / Disconnect
         self.btn_connect: ttk.Button = ttk.Button(
             self.frm_connect, text="Connect", bootstyle="success-outline",
@@ -85,12 +121,10 @@ class PresentationClickerApp(BaseApp):
             self.frm_connect, text="Disconnect", bootstyle="danger-outline",
             width=12, state=tk.DISABLED, command=self.on_disconnect)
         # Navigation
-        nav_bs = dict(bootstyle="info", width=4, state=tk.DISABLED, style="Icon.TButton")
-        self.btn_prev     = ttk.Button(self.frm_nav, text=misc_icons['prev'],   command=self.on_prev,     **nav_bs)
-        self.btn_next     = ttk.Button(self.frm_nav, text=misc_icons['next'],   command=self.on_next,     **nav_bs)
-        self.btn_start    = ttk.Button(self.frm_nav, text=misc_icons['start'],  command=self.on_start,    **nav_bs)
-        self.btn_end      = ttk.Button(self.frm_nav, text=misc_icons['end'],    command=self.on_end,      **nav_bs)
-        self.btn_blackout = ttk.Button(self.frm_nav, text=misc_icons['blackout'], command=self.on_blackout, **nav_bs)
+        for attr, icon, action in self.NAV_BUTTONS:
+            setattr(self, attr, ttk.Button(
+                self.frm_nav, text=misc_icons[icon], command=functools.partial(self._send, action),
+                **self.NAV_BUTTON_KW))
         # ── Bottom frame: Log ──
         self.frm_bottom: ttk.Frame = ttk.Frame(self.root, padding=(5))
         self.frm_log: ttk.LabelFrame = ttk.LabelFrame(
@@ -105,6 +139,15 @@ class PresentationClickerApp(BaseApp):
         self.btn_switch_theme: ttk.Button = ttk.Button(
             self.frm_nav, text=self._get_theme_icon(), width=3, 
             style="Icon.TButton", command=self._switch_theme)
+        # Widgets toggled by _set_connected: inputs are enabled while disconnected,
+        # navigation and the disconnect button while connected
+        self._input_widgets = (
+            self.ent_name, self.ent_room, self.ent_pwd,
+            self.btn_paste_room, self.btn_paste_pwd, self.btn_connect)
+        self._nav_widgets = (
+            self.btn_prev, self.btn_next, self.btn_start, self.btn_end,
+            self.btn_blackout, self.btn_disconnect)
+        self._state_scripts = self._build_state_scripts(self._input_widgets, self._nav_widgets)
 
     def _setup_log_colors(self):
         """Setup log colors for sent/received messages."""
@@ -196,128 +239,85 @@ class PresentationClickerApp(BaseApp):
             self._log("ERROR: All fields are required.")
             return
         self._log(f"Connecting as '{name}' to room '{room}'…")
-        try:
-            self.mqtt.connect(name, room, pwd)
-        except TimeoutError as e:
-            self._log(f"ERROR: {e}")
+        # Key derivation and the CONNACK wait block for up to the timeout
+        self._run_connect(self.mqtt.connect, name, room, pwd)
 
     def on_disconnect(self) -> None:
         """Handle disconnect button click. Disconnects from MQTT."""
         self._log("Disconnecting…")
-        self.mqtt.disconnect()
+        # Waits up to a second for the broker to ack the "offline" status
+        self._run_io(self.mqtt.disconnect)
 
-    def on_prev(self) -> None:
-        """Send 'previous' action to server."""
-        self.mqtt.publish_action("previous")
-    def on_next(self) -> None:
-        """Send 'next' action to server."""
-        self.mqtt.publish_action("next")
-    def on_start(self) -> None:
-        """Send 'start' action to server."""
-        self.mqtt.publish_action("start")
-    def on_end(self) -> None:
-        """Send 'end' action to server."""
-        self.mqtt.publish_action("end")
-    def on_blackout(self) -> None:
-        """Send 'blackout' action to server."""
-        self.mqtt.publish_action("blackout")
+    def _send(self, action: str) -> None:
+        """Send a navigation action (one of mqtt_client.ACTIONS) to the server."""
+        self.mqtt.publish_action(action)
 
     # MQTT client callbacks
     def _on_mqtt_connect(self) -> None:
         """MQTT callback: connected. Enables navigation and disables input fields."""
-        def update_ui():
-            self._set_connected(True)
-            host = self.mqtt.config.get('host', 'unknown')
-            port = self.mqtt.config.get('port', 'unknown')
-            self._set_title_with_server(f"MQTT: {host}:{port}")
-            self._log("Connected ✅")
-        self.root.after(0, update_ui)
+        self._post_to_ui(self._show_connected)
 
     def _on_mqtt_disconnect(self) -> None:
         """MQTT callback: disconnected. Disables navigation and enables input fields."""
-        def update_ui():
-            self._set_connected(False)
-            self.root.title("Presentation Clicker")
-            self._log("Disconnected ❌")
-        self.root.after(0, update_ui)
+        self._post_to_ui(self._show_disconnected)
 
-    def _on_mptt_publish(self, topic: str, payload: str) -> None:
+    def _show_connected(self) -> None:
+        """Update the UI after connecting (Tk thread)."""
+        self._set_connected(True)
+        host = self.mqtt.config.get('host', 'unknown')
+        port = self.mqtt.config.get('port', 'unknown')
+        self._set_title_with_server(f"MQTT: {host}:{port}")
+        self._log("Connected ✅")
+
+    def _show_disconnected(self) -> None:
+        """Update the UI after disconnecting (Tk thread)."""
+        self._set_connected(False)
+        self.root.title("Presentation Clicker")
+        self._log("Disconnected ❌")
+
+    def _on_mptt_publish(self, topic: str, event: LogEvent) -> None:
         """MQTT callback: message published. Logs outgoing messages."""
-        def log_sent():
-            try:
-                data = json.loads(payload)
-                user = data.get("user")
-                action = data.get("action")
-                if topic.endswith("/presentation") and user and action:
-                    self._log(f"Sent action '{action}' from '{user}'.", tag="sent")
-                elif topic.endswith("/status") and user:
-                    self._log(f"Sent status update for user '{user}'.", tag="sent")
-                else:
-                    self._log(f"Sent: {topic}: {payload}", tag="sent")
-            except Exception:
-                self._log(f"Sent: {topic}: {payload}", tag="sent")
-        self.root.after(0, log_sent)
+        # Only the format arguments are queued, formatting happens on the Tk thread
+        kind, user, value = event
+        args = (value, user) if kind == "action" else (user,)
+        self._queue_log(_SENT_FORMATS[kind], tag="sent", args=args)
 
-    def _on_mqtt_message(self, topic: str, payload: str) -> None:
-        """MQTT callback: message received. Parses JSON payload and logs user status/actions."""
-        def log_message():
-            try:
-                data = json.loads(payload)
-                if topic.endswith("/status"):
-                    user = data.get("user")
-                    status = data.get("status")
-                    if user and status:
-                        self._log(f"User '{user}' is now {status}.", tag="received")
-                    else:
-                        self._log(f"Malformed status message: {payload}", tag="received")
-                elif topic.endswith("/presentation"):
-                    user = data.get("user")
-                    action = data.get("action")
-                    if user and action:
-                        self._log(f"Action '{action}' from '{user}' received.", tag="received")
-                    else:
-                        self._log(f"Malformed action message: {payload}", tag="received")
-                else:
-                    self._log(f"[RCV] {topic}: {payload}", tag="received")
-            except Exception:
-                self._log(f"Malformed message: {payload}", tag="received")
-        self.root.after(0, log_message)
+    def _on_mqtt_message(self, topic: str, event: LogEvent) -> None:
+        """
+        MQTT callback: message received. The MQTT client already parsed and
+        classified the payload, so only the format arguments are queued here.
+        """
+        kind, user, value = event
+        if kind == "status":
+            args = (user, value)
+        elif kind == "action":
+            args = (value, user)
+        elif kind == "other":
+            args = (topic, value)
+        else:
+            args = (value,)
+        self._queue_log(_RECEIVED_FORMATS[kind], tag="received", args=args)
+
+    def _queue_log(self, msg: str, tag: str = None, args: tuple = None) -> None:
+        """
+        Queue a log line for the Tk thread.
+        Safe to call from the MQTT network thread.
+        Args:
+            msg: Message, or a %-format string if args are given.
+            tag: Optional tag for message type ('sent', 'received', etc.).
+            args: Optional format arguments, applied on the Tk thread.
+        """
+        self._post_to_ui(self._log_formatted, msg, tag, args)
+
+    def _log_formatted(self, msg: str, tag: Optional[str], args: Optional[tuple]) -> None:
+        """Format a queued log line and hand it to the (batching) logger."""
+        self._log(msg % args if args is not None else msg, tag=tag)
 
     # ─── Helpers ────────────────────────────────────────────────────────
 
     def _set_connected(self, is_connected: bool) -> None:
-        """Enable/disable UI elements based on connection state."""
-        # Input fields & connect button
-        state_input = tk.DISABLED if is_connected else tk.NORMAL
-        state_conn = tk.DISABLED if is_connected else tk.NORMAL
-        state_disconn = tk.NORMAL if is_connected else tk.DISABLED
-        state_nav = tk.NORMAL if is_connected else tk.DISABLED
-        
-        # Disable/enable input fields
-        self.ent_name.config(state=state_input)
-        self.ent_room.config(state=state_input)
-        self.ent_pwd.config(state=state_input)
-        
-        # Disable/enable paste buttons
-        self.btn_paste_room.config(state=state_input)
-        self.btn_paste_pwd.config(state=state_input)
-        
-        # Disable/enable connection buttons
-        self.btn_connect.config(state=state_conn)
-        self.btn_disconnect.config(state=state_disconn)
-        
-        # Navigation buttons
-        for btn in [self.btn_prev, self.btn_next, self.btn_start, self.btn_end, self.btn_blackout]:
-            btn.config(state=state_nav)
-
-    def _paste_to_entry(self, entry: ttk.Entry) -> None:
-        """Paste clipboard content to specified entry widget."""
-        try:
-            clipboard = self.root.clipboard_get()
-            entry.delete(0, tk.END)
-            entry.insert(0, clipboard)
-        except tk.TclError:
-            pass  # Clipboard empty or unavailable
+        """Enable/disable UI elements based on connection state (one Tcl eval)."""
+        self.root.tk.eval(self._state_scripts[is_connected])
 
 
 # Create main function using the factory
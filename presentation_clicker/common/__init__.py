@@ -7,10 +7,11 @@ __version__ = "0.1.0"
 
 # Import all commonly used functions and classes for convenient access
 from .mqtt_config import load_mqtt_config, update_mqtt_config, DEFAULT_CONFIG
-from .encryption import get_fernet
+from .encryption import get_fernet, clear_key_cache, DECRYPT_ERRORS
 from .ui_common import ThemeManager, get_misc_icons
-from .cli_common import create_common_parser, validate_args, load_theme_from_config, handle_config_operations
+from .cli_common import create_common_parser, args_from_overrides, validate_args, load_theme_from_config, handle_config_operations
 from .topics import get_base_topic
+from .serialization import json_loads, json_dumps, as_text
 from .logging_common import UILogger, get_message_colors
 from .mqtt_base import BaseMqttHandler
 from .ui_base import BaseApp, create_main_function
@@ -21,13 +22,19 @@ __all__ = [
     'update_mqtt_config', 
     'DEFAULT_CONFIG',
     'get_fernet',
+    'clear_key_cache',
+    'DECRYPT_ERRORS',
     'ThemeManager',
     'get_misc_icons',
     'create_common_parser',
+    'args_from_overrides',
     'validate_args',
     'load_theme_from_config',
     'handle_config_operations',
     'get_base_topic',
+    'json_loads',
+    'json_dumps',
+    'as_text',
     'UILogger',
     'get_message_colors',
     'BaseMqttHandler',
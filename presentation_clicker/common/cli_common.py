@@ -4,9 +4,29 @@ Shared command-line interface utilities for Presentation Clicker.
 """
 import argparse
 import os
-import yaml
 from typing import Optional
 
+from .mqtt_config import load_mqtt_config
+
+# Defaults of the common arguments, used when args are passed in pre-parsed
+COMMON_ARG_DEFAULTS = {
+    'host': None,
+    'port': None,
+    'keepalive': None,
+    'open_config_dir': False,
+    'transport': None,
+    'theme': None,
+}
+
+# Checks for the common arguments: (name, is_valid, error message).
+# Arguments that are None (not given) are not checked.
+_VALIDATORS = (
+    ('host', lambda v: isinstance(v, str) and bool(v.strip()), "--host must be a non-empty string."),
+    ('port', lambda v: 1 <= v <= 65535, "--port must be an integer between 1 and 65535."),
+    ('keepalive', lambda v: v > 0, "--keepalive must be a positive integer."),
+    ('transport', lambda v: v in ('tcp', 'websockets'), "--transport must be 'tcp' or 'websockets'."),
+)
+
 def create_common_parser(description: str) -> argparse.ArgumentParser:
     """
     Create a common argument parser with shared options.
@@ -26,6 +46,18 @@ def create_common_parser(description: str) -> argparse.ArgumentParser:
     parser.add_argument('--theme', type=str, help='UI theme (e.g., flatly, darkly)')
     return parser
 
+def args_from_overrides(overrides: dict) -> argparse.Namespace:
+    """
+    Build an argument namespace from already parsed option values.
+    
+    Args:
+        overrides: Dict of option name -> value (e.g. {'host': 'example.com'}).
+        
+    Returns:
+        argparse.Namespace: Namespace with all common options set.
+    """
+    return argparse.Namespace(**{**COMMON_ARG_DEFAULTS, **overrides})
+
 def validate_args(args) -> bool:
     """
     Validate common command-line arguments.
@@ -36,29 +68,18 @@ def validate_args(args) -> bool:
     Returns:
         bool: True if valid, False otherwise.
     """
-    if args.host is not None and (not isinstance(args.host, str) or not args.host.strip()):
-        print("Error: --host must be a non-empty string.")
-        return False
-    
-    if args.port is not None:
-        if not (1 <= args.port <= 65535):
-            print("Error: --port must be an integer between 1 and 65535.")
+    for name, is_valid, error in _VALIDATORS:
+        value = getattr(args, name)
+        if value is not None and not is_valid(value):
+            print(f"Error: {error}")
             return False
-    
-    if args.keepalive is not None:
-        if args.keepalive <= 0:
-            print("Error: --keepalive must be a positive integer.")
-            return False
-    
-    if args.transport is not None and args.transport not in ('tcp', 'websockets'):
-        print("Error: --transport must be 'tcp' or 'websockets'.")
-        return False
-    
     return True
 
 def load_theme_from_config(config_path: str, default_theme: str = "flatly") -> str:
     """
     Load theme from config file.
+    Uses the shared (cached) config parse, so the MQTT handler created
+    afterwards does not read the file again.
     
     Args:
         config_path: Path to config file.
@@ -67,14 +88,7 @@ def load_theme_from_config(config_path: str, default_theme: str = "flatly") -> s
     Returns:
         str: Theme name.
     """
-    config = {}
-    if os.path.exists(config_path):
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-        except Exception:
-            pass
-    return config.get('theme', default_theme)
+    return load_mqtt_config(config_path).get('theme', default_theme)
 
 def handle_config_operations(args, config_path: str, app_theme: str) -> tuple[bool, bool]:
     """
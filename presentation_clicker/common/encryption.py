@@ -3,22 +3,82 @@ encryption.py
 Shared encryption utilities for Presentation Clicker.
 """
 import base64
-from cryptography.fernet import Fernet
+import functools
+from cryptography.fernet import Fernet, InvalidToken
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
+try:
+    # Optional Rust implementation of Fernet (same token format, much faster per message)
+    import rfernet
+except ImportError:
+    rfernet = None
+
+# Exceptions raised by Fernet.decrypt for tokens that can't be decrypted
+DECRYPT_ERRORS = (InvalidToken,)
+
+
+class _RFernet:
+    """
+    rfernet.Fernet with cryptography's bytes interface: rfernet returns tokens
+    as str and only decrypts str tokens, while MQTT payloads are bytes.
+    Decryption failures raise InvalidToken, like cryptography's Fernet.
+    """
+    __slots__ = ("_fernet",)
+
+    def __init__(self, key: bytes):
+        self._fernet = rfernet.Fernet(key.decode("ascii"))
+
+    def encrypt(self, data: bytes) -> bytes:
+        """Encrypt data and return the token as bytes."""
+        return self._fernet.encrypt(data).encode("ascii")
+
+    def decrypt(self, token: bytes) -> bytes:
+        """Decrypt a token (bytes or str); raises InvalidToken if it can't be decrypted."""
+        try:
+            if not isinstance(token, str):
+                token = token.decode("ascii")
+            return self._fernet.decrypt(token)
+        except (UnicodeDecodeError, rfernet.DecryptionError) as e:
+            raise InvalidToken from e
+
+SALT = b"presentationclicker_salt"  # Use a constant salt or store per-room for more security
+
 def get_fernet(pwd: str) -> Fernet:
     """
     Derives a Fernet encryption key from the password using PBKDF2HMAC.
+    The derivation is cached, so reconnecting with the same password is cheap.
+    Uses rfernet (behind a bytes adapter) when it is installed, otherwise
+    cryptography's Fernet.
     
     Args:
         pwd: Password string.
         
     Returns:
-        Fernet: Fernet encryption object.
+        Fernet: Fernet encryption object. encrypt/decrypt take and return
+        bytes; decrypt raises InvalidToken for tokens it can't decrypt.
     """
-    salt = b"presentationclicker_salt"  # Use a constant salt or store per-room for more security
+    key = _derive_key(pwd, SALT)
+    if rfernet is not None:
+        return _RFernet(key)
+    return Fernet(key)
+
+@functools.lru_cache(maxsize=32)
+def _derive_key(pwd: str, salt: bytes) -> bytes:
+    """
+    Run the (expensive) PBKDF2HMAC key derivation for a password and salt.
+    
+    Args:
+        pwd: Password string.
+        salt: Salt for the key derivation.
+        
+    Returns:
+        bytes: URL-safe base64 encoded Fernet key.
+    """
+    # Client and listener must derive the same key, so changing the KDF (or its
+    # parameters) breaks compatibility with older installs. The cost is paid
+    # once per password thanks to the lru_cache on this function.
     kdf = PBKDF2HMAC(
         algorithm=hashes.SHA256(),
         length=32,
@@ -26,5 +86,11 @@ def get_fernet(pwd: str) -> Fernet:
         iterations=100_000,
         backend=default_backend()
     )
-    key = base64.urlsafe_b64encode(kdf.derive(pwd.encode("utf-8")))
-    return Fernet(key)
+    return base64.urlsafe_b64encode(kdf.derive(pwd.encode("utf-8")))
+
+def clear_key_cache() -> None:
+    """
+    Drop all cached derived keys (e.g. when leaving a room), so the next
+    get_fernet call for a password runs the key derivation again.
+    """
+    _derive_key.cache_clear()
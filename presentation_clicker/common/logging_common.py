@@ -2,7 +2,9 @@
 logging_common.py
 Shared logging utilities for Presentation Clicker UI components.
 """
-import datetime
+import collections
+import functools
+import time
 import tkinter as tk
 from typing import Optional, Callable, Dict, Any
 
@@ -13,17 +15,35 @@ class UILogger:
     Handles timestamped logging with optional color tagging and theme-aware colors.
     """
     
-    def __init__(self, text_widget: tk.Text, theme_manager=None):
+    def __init__(self, text_widget: tk.Text, theme_manager=None, max_lines: int = 2000):
         """
         Initialize the UI logger.
         
         Args:
             text_widget: The tkinter Text widget to log to.
             theme_manager: Optional theme manager for color calculations.
+            max_lines: Maximum number of lines kept in the log; older lines are dropped.
         """
         self.txt_log = text_widget
         self.theme_manager = theme_manager
+        self._max_lines = max_lines
+        # Raw Tcl access for toggling -state, skipping Misc.configure's option handling
+        self._tcl_call = text_widget.tk.call
+        self._widget_path = str(text_widget)
         self._user_color_func: Optional[Callable[[str], str]] = None
+        # Background color currently configured for each user's log tag
+        self._user_tag_colors: Dict[str, str] = {}
+        # Lines waiting for the next idle flush, as (time, msg, tag) tuples; the
+        # timestamp is only formatted when a line is written. Lines are kept here
+        # while the log isn't viewable (e.g. minimized window), only as many as
+        # the widget would keep anyway.
+        self._pending: collections.deque = collections.deque(maxlen=max_lines)
+        self._flush_scheduled = False
+        # Write out lines held back while hidden once the window is shown again
+        text_widget.winfo_toplevel().bind("<Map>", self._on_map, add="+")
+        # Formatted timestamp of the last second something was logged in
+        self._ts_sec = 0
+        self._ts_str = ""
     
     def set_user_color_function(self, color_func: Callable[[str], str]):
         """
@@ -37,31 +57,83 @@ class UILogger:
     def log(self, msg: str, tag: str = None, user: str = None) -> None:
         """
         Append a timestamped message to the log window.
+        Messages are buffered and written in one batch when Tk is idle.
         
         Args:
             msg: Message string.
             tag: Optional tag for message type ('sent', 'received', etc.).
             user: Optional username for user-specific coloring.
         """
-        timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        self.txt_log.config(state=tk.NORMAL)
-        
         # Determine tag to use
         if user and self._user_color_func:
             # User-specific tag with color
             tag_name = f"userlog_{user}"
             user_color = self._user_color_func(user)
-            self.txt_log.tag_configure(tag_name, background=user_color)
-            self.txt_log.insert("end", f"[{timestamp}] {msg}\n", tag_name)
-        elif tag:
-            # Generic tag (sent, received, etc.)
-            self.txt_log.insert("end", f"[{timestamp}] {msg}\n", tag)
+            if self._user_tag_colors.get(user) != user_color:
+                self.txt_log.tag_configure(tag_name, background=user_color)
+                self._user_tag_colors[user] = user_color
         else:
-            # No tag
-            self.txt_log.insert("end", f"[{timestamp}] {msg}\n")
+            # Generic tag (sent, received, etc.) or no tag
+            tag_name = tag
         
+        self._pending.append((time.time(), msg, tag_name))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.txt_log.after_idle(self._flush)
+    
+    def _timestamp(self, when: float) -> str:
+        """
+        Return the local time of when (seconds since the epoch) as 'YYYY-MM-DD HH:MM:SS'.
+        The formatted string is reused for all lines logged within the same second.
+        """
+        sec = int(when)
+        if sec != self._ts_sec:
+            self._ts_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(sec))
+            self._ts_sec = sec
+        return self._ts_str
+    
+    def _flush(self) -> None:
+        """
+        Write all buffered lines with a single insert, drop the oldest lines
+        beyond max_lines and scroll to the end. Does nothing while the log
+        isn't viewable.
+        """
+        self._flush_scheduled = False
+        pending = self._pending
+        if not pending:
+            return
+        if not self.txt_log.winfo_viewable():
+            return  # Nobody can see the log, keep buffering until _on_map
+        # Text.insert accepts alternating chars/tags arguments; consecutive
+        # lines with the same tag are joined into a single chunk
+        timestamp = self._timestamp
+        args = []
+        run, run_tag = [], None
+        while pending:
+            when, msg, tag = pending.popleft()
+            if run and tag != run_tag:
+                args.append("".join(run))
+                args.append(run_tag or ())
+                run = []
+            run.append(f"[{timestamp(when)}] {msg}\n")
+            run_tag = tag
+        args.append("".join(run))
+        args.append(run_tag or ())
+        
+        self._tcl_call(self._widget_path, "configure", "-state", tk.NORMAL)
+        self.txt_log.insert("end", *args)
+        # The text always ends with a newline, so "end-1c" sits on an empty last line
+        excess = int(self.txt_log.index("end-1c").split(".")[0]) - 1 - self._max_lines
+        if excess > 0:
+            self.txt_log.delete("1.0", f"{excess + 1}.0")
         self.txt_log.see("end")
-        self.txt_log.config(state=tk.DISABLED)
+        self._tcl_call(self._widget_path, "configure", "-state", tk.DISABLED)
+    
+    def _on_map(self, event=None) -> None:
+        """Schedule a flush of lines buffered while the log wasn't viewable."""
+        if self._pending and not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.txt_log.after_idle(self._flush)
     
     def update_theme_colors(self, color_updates: Dict[str, str] = None):
         """
@@ -83,16 +155,18 @@ class UILogger:
         
         # Update user log colors if we have a color function
         if self._user_color_func:
-            for tag_name in self.txt_log.tag_names():
-                if tag_name.startswith("userlog_"):
-                    user = tag_name.replace("userlog_", "")
-                    user_color = self._user_color_func(user)
-                    self.txt_log.tag_configure(tag_name, background=user_color)
+            for user, old_color in self._user_tag_colors.items():
+                user_color = self._user_color_func(user)
+                if user_color != old_color:
+                    self.txt_log.tag_configure(f"userlog_{user}", background=user_color)
+                    self._user_tag_colors[user] = user_color
 
 
+@functools.lru_cache(maxsize=None)
 def get_message_colors(is_dark_theme: bool) -> Dict[str, str]:
     """
     Get standard message colors for sent/received messages based on theme.
+    The result is cached per theme type and must not be mutated.
     
     Args:
         is_dark_theme: Whether the current theme is dark.
@@ -3,27 +3,45 @@ mqtt_base.py
 Base MQTT handler with common functionality for Presentation Clicker.
 Handles encryption, reconnect logic, and common callbacks.
 """
-import json
+import functools
 import os
 import threading
-import time
 from abc import ABC, abstractmethod
-from typing import Callable, Optional
+from typing import Callable, Optional, Union
 
 import paho.mqtt.client as mqtt
-from cryptography.fernet import InvalidToken
 
 from .mqtt_config import load_mqtt_config, DEFAULT_CONFIG
-from .encryption import get_fernet
+from .encryption import get_fernet, DECRYPT_ERRORS
+from .serialization import json_dumps
 from .topics import get_base_topic
 
 
+@functools.lru_cache(maxsize=64)
+def _dumps_items(items: tuple) -> bytes:
+    """
+    Serialize a flat payload given as a tuple of (key, value, type) triples.
+    Cached, since clicker traffic is a small set of repeated messages. The
+    value types are part of the key so e.g. 1 and True don't share an entry.
+    """
+    return json_dumps({key: value for key, value, _ in items})
+
+
 class BaseMqttHandler(ABC):
     """
     Base MQTT handler with common functionality for client and server.
     Handles encryption, reconnect logic, and common callbacks.
     """
     
+    # Fixed attribute layout: paho's network thread reads these on every
+    # message. Subclasses declare their own __slots__ for additional state.
+    __slots__ = (
+        "config", "_host", "_port", "_keepalive", "_transport",
+        "on_connect", "on_disconnect", "on_message",
+        "client", "_client_id", "connected", "_connected_event",
+        "room", "pwd", "base_topic", "_sub_filter", "fernet", "_decrypt",
+    )
+    
     def __init__(self, config_path: str):
         """
         Initialize the MQTT handler with common state and callbacks.
@@ -31,43 +49,112 @@ class BaseMqttHandler(ABC):
             config_path: Path to the MQTT config file.
         """
         self.config = load_mqtt_config(config_path)
-        transport = self.config.get("transport", DEFAULT_CONFIG["transport"])
+        # Connection parameters, resolved once (the config is fixed per handler)
+        self._host, self._port, self._keepalive, self._transport = (
+            self.config.get(key, DEFAULT_CONFIG[key])
+            for key in ("host", "port", "keepalive", "transport")
+        )
         
         # UI callbacks (to be set by UI layer)
         self.on_connect: Callable[[], None] = lambda: None
         self.on_disconnect: Callable[[], None] = lambda: None
-        self.on_message: Callable[[str, str], None] = lambda topic, payload: None
+        # Receives the decrypted payload bytes (or an error text if decryption failed)
+        self.on_message: Callable[[str, Union[str, bytes]], None] = lambda topic, payload: None
         
         # MQTT client setup
-        self.client: mqtt.Client = mqtt.Client(transport=transport)
-        self.client.on_connect = self._on_connect
-        self.client.on_disconnect = self._on_disconnect
-        self.client.on_message = self._on_message
-        self.client.on_log = self._on_log
+        self.client: mqtt.Client = None
+        self._client_id: str = ""
+        self._create_client()
         
         # Connection state
-        self._should_reconnect: bool = True
-        self._reconnect_thread: Optional[threading.Thread] = None
         self.connected: bool = False
+        # Signaled from _on_connect so connect() can block without polling
+        self._connected_event = threading.Event()
         self.room: Optional[str] = None
         self.pwd: Optional[str] = None
         self.base_topic: Optional[str] = None
+        # Subscription filter for all room topics (set by _set_room)
+        self._sub_filter: Optional[str] = None
         self.fernet = None
+        self._decrypt: Optional[Callable[[bytes], bytes]] = None
+
+    def _create_client(self, client_id: str = "", clean_session: bool = True) -> None:
+        """
+        Create the paho client and register the internal callbacks.
+        Args:
+            client_id: MQTT client id (empty for a broker-assigned one).
+            clean_session: False to let the broker keep the session between connects.
+        """
+        self._stop_client()
+        self._client_id = client_id
+        self.client = mqtt.Client(
+            mqtt.CallbackAPIVersion.VERSION2,
+            client_id=client_id,
+            clean_session=clean_session,
+            transport=self._transport,
+        )
+        self.client.on_connect = self._on_connect
+        self.client.on_disconnect = self._on_disconnect
+        self.client.on_message = self._on_message
+        # Paho calls on_log for every packet, so only hook it up for debugging
+        if os.environ.get("CLICKER_MQTT_DEBUG"):
+            self.client.on_log = self._on_log
+        # Let bursts of QoS 1 messages (e.g. rapid "next next next") stream
+        # without waiting for each PUBACK before sending the next one
+        self.client.max_inflight_messages_set(20)
+        self.client.max_queued_messages_set(1000)
+        # Paho's network thread reconnects by itself after unexpected
+        # disconnects, backing off exponentially between attempts
+        self.client.reconnect_delay_set(min_delay=1, max_delay=30)
+
+    def _stop_client(self) -> None:
+        """
+        Disconnect the current paho client (if any) and stop its network
+        thread, so a replaced client can't keep running or reconnecting.
+        Must not be called from the paho network thread.
+        """
+        old = self.client
+        if old is None:
+            return
+        # The old client must not report into the new connection's state
+        old.on_connect = old.on_disconnect = old.on_message = None
+        old.disconnect()
+        old.loop_stop()
+        self.connected = False
 
-    def _get_base_topic(self) -> str:
+    def _set_room(self, room: str) -> None:
         """
-        Returns the base MQTT topic for the current room.
+        Set the room and derive its topics once, so the publish and
+        subscribe paths only read attributes.
+        Args:
+            room: Room code.
         """
-        return get_base_topic(self.room)
+        self.room = room
+        self.base_topic = get_base_topic(room)
+        self._sub_filter = f"{self.base_topic}/#"
 
     def _setup_encryption(self, pwd: str) -> None:
         """
         Setup encryption using the room password.
+        Decryption goes through a small LRU cache bound to this Fernet
+        instance, so retained messages redelivered on every (re)connect
+        are only decrypted once.
         Args:
             pwd: Room password for encryption key derivation.
         """
         self.pwd = pwd
         self.fernet = get_fernet(pwd)
+        self._decrypt = functools.lru_cache(maxsize=64)(self.fernet.decrypt)
+
+    def _check_not_connected(self) -> None:
+        """
+        Refuse to connect again while connected: clearing the connected event
+        and timing out would stop the live session's network thread.
+        Raises:
+            RuntimeError: If already connected.
+        """
+        if self.connected:
+            raise RuntimeError("Already connected, disconnect first.")
 
     def _connect_to_broker(self, timeout: int = 5) -> None:
         """
@@ -76,23 +163,16 @@ class BaseMqttHandler(ABC):
             timeout: Connection timeout in seconds.
         Raises:
             TimeoutError: If connection times out.
+            RuntimeError: If already connected.
         """
-        # Get connection parameters from config
-        host = self.config.get("host", DEFAULT_CONFIG["host"])
-        port = self.config.get("port", DEFAULT_CONFIG["port"])
-        keepalive = self.config.get("keepalive", DEFAULT_CONFIG["keepalive"])
-        
+        self._check_not_connected()
         # Connect asynchronously
-        self.client.connect_async(host, port, keepalive=keepalive)
-        self._should_reconnect = True
+        self.client.connect_async(self._host, self._port, keepalive=self._keepalive)
+        self._connected_event.clear()
         self.client.loop_start()
         
         # Wait for connection or timeout
-        start = time.time()
-        while not self.connected and (time.time() - start) < timeout:
-            time.sleep(0.1)
-        
-        if not self.connected:
+        if not self._connected_event.wait(timeout):
             self.client.loop_stop()
             raise TimeoutError(f"MQTT connection timed out after {timeout} seconds.")
 
@@ -100,14 +180,15 @@ class BaseMqttHandler(ABC):
         """
         Disconnect from the MQTT broker and stop the client loop.
         """
-        self._should_reconnect = False
         if self.client:
             self.connected = False
-            # Note: loop_stop() can cause freezing issues with paho-mqtt
-            # self.client.loop_stop()
             self.client.disconnect()
+            # Joins the network thread, which exits once the DISCONNECT is sent.
+            # Safe since callbacks never block on the Tk thread (see _post_to_ui);
+            # called from the network thread itself, paho skips the join.
+            self.client.loop_stop()
 
-    def publish_encrypted(self, topic: str, payload: dict, qos: int = 1, retain: bool = False) -> None:
+    def publish_encrypted(self, topic: str, payload: dict, qos: int = 1, retain: bool = False) -> mqtt.MQTTMessageInfo:
         """
         Publish an encrypted message to the specified topic.
         Args:
@@ -115,69 +196,69 @@ class BaseMqttHandler(ABC):
             payload: Dictionary payload to encrypt and publish.
             qos: MQTT QoS level.
             retain: Whether to retain the message.
+        Returns:
+            MQTTMessageInfo: Paho publish info (e.g. for wait_for_publish).
         """
         if not self.fernet:
             raise RuntimeError("Encryption not set up. Call _setup_encryption first.")
         
-        json_payload = json.dumps(payload)
-        encrypted = self.fernet.encrypt(json_payload.encode()).decode()
-        self.client.publish(topic, encrypted, qos=qos, retain=retain)
+        try:
+            data = _dumps_items(tuple((k, v, type(v)) for k, v in payload.items()))
+        except TypeError:
+            data = json_dumps(payload)  # Unhashable (nested) values, can't be cached
+        encrypted = self.fernet.encrypt(data)
+        return self.client.publish(topic, encrypted, qos=qos, retain=retain)
 
     # ─── Internal MQTT Callbacks ────────────────────────────────────
     
     @abstractmethod
-    def _on_connect_handler(self, client: mqtt.Client, userdata, flags, rc) -> None:
+    def _on_connect_handler(self, client: mqtt.Client, userdata, flags: mqtt.ConnectFlags, reason_code) -> None:
         """
         Abstract method for handling connection-specific logic.
         Must be implemented by subclasses.
         """
         pass
 
-    def _on_connect(self, client: mqtt.Client, userdata, flags, rc) -> None:
+    def _on_connect(self, client: mqtt.Client, userdata, flags: mqtt.ConnectFlags, reason_code, properties) -> None:
         """
         Internal callback for MQTT connect event.
         Calls the abstract handler and then the UI callback.
         """
         self.connected = True
-        self._on_connect_handler(client, userdata, flags, rc)
+        self._connected_event.set()
+        self._on_connect_handler(client, userdata, flags, reason_code)
         self.on_connect()
 
-    def _on_disconnect(self, client: mqtt.Client, userdata, rc) -> None:
+    def _on_disconnect(self, client: mqtt.Client, userdata, disconnect_flags, reason_code, properties) -> None:
         """
         Internal callback for MQTT disconnect event.
-        Handles reconnect logic if needed.
+        Reconnecting after unexpected disconnects is left to paho's network
+        thread (see reconnect_delay_set in _create_client).
         """
         self.connected = False
+        self._connected_event.clear()
         self.on_disconnect()
-        
-        if self._should_reconnect and rc != 0:
-            if not self._reconnect_thread or not self._reconnect_thread.is_alive():
-                self._reconnect_thread = threading.Thread(target=self._reconnect_loop, daemon=True)
-                self._reconnect_thread.start()
-
-    def _reconnect_loop(self) -> None:
-        """
-        Background thread for reconnecting to the broker.
-        """
-        while self._should_reconnect and not self.connected:
-            try:
-                self.client.reconnect()
-            except Exception:
-                time.sleep(3)
 
     def _on_message(self, client: mqtt.Client, userdata, msg) -> None:
         """
         Internal callback for MQTT message event.
-        Decrypts and passes message to UI callback.
+        Decrypts and passes the message bytes to UI callback.
+        Never raises: paho re-raises callback exceptions, which would stop the
+        network thread (and with it all reconnects).
         """
         try:
-            decrypted = self.fernet.decrypt(msg.payload).decode()
+            try:
+                decrypted = self._decrypt(msg.payload)
+            except DECRYPT_ERRORS as e:
+                self.on_message(msg.topic, f"[Decryption failed: {e}]")
+                return
             self.on_message(msg.topic, decrypted)
-        except (InvalidToken, Exception) as e:
-            self.on_message(msg.topic, f"[Decryption failed: {e}]")
+        except Exception as e:
+            print(f"[MQTT] Error handling message on {msg.topic}: {e!r}")
 
     def _on_log(self, client: mqtt.Client, userdata, level, buf) -> None:
         """
-        Internal callback for MQTT log events (optional, for debugging).
+        Internal callback for MQTT log events.
+        Only registered when the CLICKER_MQTT_DEBUG environment variable is set.
         """
-        pass  # Optionally log MQTT debug info
+        print(f"[MQTT] {buf}")
@@ -5,6 +5,12 @@ Shared MQTT configuration utilities for Presentation Clicker.
 import os
 import yaml
 
+try:
+    # Use the libyaml C bindings when available
+    from yaml import CSafeLoader as _SafeLoader, CSafeDumper as _SafeDumper
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader, SafeDumper as _SafeDumper
+
 DEFAULT_CONFIG = {
     "host": "test.mosquitto.org",
     "port": 1883,
@@ -12,10 +18,39 @@ DEFAULT_CONFIG = {
     "transport": "tcp"  # 'tcp' or 'websockets'
 }
 
+# Config files keyed by path: (st_mtime_ns, file contents, contents merged
+# over DEFAULT_CONFIG). Cached dicts are shared and must not be mutated.
+_cache: dict = {}
+
+def _read_config(config_path: str) -> tuple:
+    """
+    Return the parsed config file, re-reading it only if its modification
+    time changed.
+    
+    Args:
+        config_path: Path to the MQTT config file.
+        
+    Returns:
+        tuple: (file contents, contents merged over DEFAULT_CONFIG).
+        
+    Raises:
+        Exception: If the file is missing or not a valid YAML mapping.
+    """
+    mtime = os.stat(config_path).st_mtime_ns
+    cached = _cache.get(config_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1], cached[2]
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = yaml.load(f, Loader=_SafeLoader) or {}
+    merged = {**DEFAULT_CONFIG, **config}
+    _cache[config_path] = (mtime, config, merged)
+    return config, merged
+
 def load_mqtt_config(config_path: str) -> dict:
     """
     Load MQTT configuration from a YAML file.
     Returns default config if file is missing or invalid.
+    The parsed result is cached until the file's modification time changes.
     
     Args:
         config_path: Path to the MQTT config file.
@@ -23,14 +58,12 @@ def load_mqtt_config(config_path: str) -> dict:
     Returns:
         dict: Configuration dictionary with default values merged.
     """
-    if os.path.exists(config_path):
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-                return {**DEFAULT_CONFIG, **config}
-        except Exception:
-            pass
-    return DEFAULT_CONFIG.copy()
+    try:
+        _, merged = _read_config(config_path)
+    except Exception:
+        return DEFAULT_CONFIG.copy()
+    # Shallow copy so callers can mutate their config freely
+    return dict(merged)
 
 def update_mqtt_config(config_path: str, host=None, port=None, keepalive=None, transport=None, theme=None):
     """
@@ -44,31 +77,27 @@ def update_mqtt_config(config_path: str, host=None, port=None, keepalive=None, t
         transport: MQTT transport protocol.
         theme: UI theme name.
     """
-    config = {}
-    if os.path.exists(config_path):
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-        except Exception:
-            pass
+    updates = {
+        'host': host,
+        'port': port,
+        'keepalive': keepalive,
+        'transport': transport,
+        'theme': theme,
+    }
+    updates = {key: value for key, value in updates.items() if value is not None}
+    if not updates:
+        return  # Nothing to change, don't touch the disk
     
-    changed = False
-    if host is not None:
-        config['host'] = host
-        changed = True
-    if port is not None:
-        config['port'] = port
-        changed = True
-    if keepalive is not None:
-        config['keepalive'] = keepalive
-        changed = True
-    if transport is not None:
-        config['transport'] = transport
-        changed = True
-    if theme is not None:
-        config['theme'] = theme
-        changed = True
+    try:
+        config = dict(_read_config(config_path)[0])
+    except Exception:
+        config = {}  # Missing or invalid file, start from scratch
+    config.update(updates)
     
-    if changed:
-        with open(config_path, 'w', encoding='utf-8') as f:
-            yaml.safe_dump(config, f)
+    # Write to a temporary file first so a crash never leaves a corrupt config
+    tmp_path = config_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        yaml.dump(config, f, Dumper=_SafeDumper, default_flow_style=False, sort_keys=False)
+    os.replace(tmp_path, config_path)
+    # The file now holds exactly this config, so the next load needs no parse
+    _cache[config_path] = (os.stat(config_path).st_mtime_ns, config, {**DEFAULT_CONFIG, **config})
@@ -0,0 +1,38 @@
+"""
+serialization.py
+Shared JSON helpers for Presentation Clicker.
+Uses orjson when it is installed and falls back to the standard library.
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson  # Optional, faster JSON (de)serialization
+except ImportError:
+    orjson = None
+
+# Both orjson.loads and json.loads accept str and bytes payloads
+json_loads = orjson.loads if orjson else json.loads
+
+if orjson:
+    # orjson serializes straight to UTF-8 bytes
+    json_dumps = orjson.dumps
+else:
+    def json_dumps(obj: Any) -> bytes:
+        """Serialize obj to compact UTF-8 encoded JSON bytes."""
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def as_text(payload: Union[str, bytes]) -> str:
+    """
+    Return a printable version of a str or bytes payload.
+    
+    Args:
+        payload: Message payload.
+        
+    Returns:
+        str: Decoded payload (invalid UTF-8 is replaced).
+    """
+    if isinstance(payload, bytes):
+        return payload.decode("utf-8", errors="replace")
+    return payload
@@ -4,16 +4,19 @@ Base UI application with common functionality for Presentation Clicker.
 Handles theme management, fonts, logging, and common UI patterns.
 """
 import os
+import queue
+import threading
 import tkinter as tk
 from abc import ABC, abstractmethod
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
 
 from ttkbootstrap import Style
 from ttkbootstrap.constants import PRIMARY
 
 from .ui_common import ThemeManager, get_misc_icons
-from .logging_common import UILogger
-from .cli_common import create_common_parser, validate_args, load_theme_from_config, handle_config_operations
+from .logging_common import UILogger, get_message_colors
+from .cli_common import create_common_parser, args_from_overrides, validate_args, load_theme_from_config, handle_config_operations
 
 
 class BaseApp(ABC):
@@ -22,6 +25,9 @@ class BaseApp(ABC):
     Handles theme management, fonts, logging, and window setup.
     """
     
+    # Poll interval of the queue that hands MQTT events to the Tk thread
+    UI_QUEUE_INTERVAL_MS = 16
+    
     def __init__(self, app_title: str, theme: str = "flatly", config_path: str = None):
         """
         Initialize the base UI application.
@@ -47,13 +53,38 @@ class BaseApp(ABC):
         self._set_fonts()
         
         # Will be set by subclasses
-        self.txt_log = None
-        self.logger = None
+        self.txt_log: Optional[tk.Text] = None
+        self.logger: Optional[UILogger] = None
+        self.btn_switch_theme = None
+        self.mqtt = None
+        
+        # Pending after() job that writes the theme to the config file
+        self._theme_save_job: Optional[str] = None
+        # Config file writes run here, one at a time and in order, off the Tk thread
+        self._config_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="clicker-config")
+        # Blocking MQTT calls (connect/disconnect, see _run_io) run here, so a
+        # theme save never waits behind a connect's CONNACK timeout
+        self._io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="clicker-io")
+        
+        # Work posted from the MQTT network thread, run on the Tk thread (~60 Hz)
+        self._ui_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._ui_thread_id: int = threading.get_ident()
+        self.root.after(self.UI_QUEUE_INTERVAL_MS, self._drain_ui_queue)
 
     def _set_fonts(self) -> None:
         """Set fonts: default, monospace for log, and icon font for icons."""
         self.font_mono = ("Courier New", 9)
         self.font_icon = ("Segoe MDL2 Assets", 12)
+        # ttk styles are per theme, so the custom styles are configured again
+        # the first time each other theme is used (see _switch_theme)
+        self._configure_theme_styles()
+        self._styled_themes = {self.style.theme.name}
+
+    def _configure_theme_styles(self) -> None:
+        """
+        Configure the custom ttk styles (fonts) for the current theme.
+        Subclasses extending this should call the base implementation.
+        """
         # Define a custom style for icon buttons
         self.style.configure("Icon.TButton", font=self.font_icon)
 
@@ -62,9 +93,8 @@ class BaseApp(ABC):
         Configure text widget colors and font to match the current theme.
         Call this after creating a text widget.
         """
-        bg_color = self.style.colors.bg
-        fg_color = self.style.colors.fg
-        text_widget.configure(bg=bg_color, fg=fg_color, font=self.font_mono)
+        colors = self.style.colors
+        text_widget.configure(bg=colors.bg, fg=colors.fg, font=self.font_mono)
 
     def _is_dark_theme(self) -> bool:
         """Detect if the current theme is dark based on the background color luminance."""
@@ -85,33 +115,80 @@ class BaseApp(ABC):
 
     def _switch_theme(self) -> None:
         """Toggle between light and dark themes and save to config."""
-        self.theme_manager.switch_theme()
+        new_theme = self.theme_manager.switch_theme(save=False)
         
-        # Re-apply icon font style after theme change (required for ttkbootstrap)
-        self.style.configure("Icon.TButton", font=self.font_icon)
+        # Debounce the config write so rapid toggling only writes once
+        if self._theme_save_job is not None:
+            self.root.after_cancel(self._theme_save_job)
+        self._theme_save_job = self.root.after(500, self._save_theme)
+        
+        # Apply the custom styles the first time a theme is used (required for
+        # ttkbootstrap, it builds each theme with its own styles)
+        if new_theme not in self._styled_themes:
+            self._configure_theme_styles()
+            self._styled_themes.add(new_theme)
         
         # Update the theme toggle button icon after switching
-        if hasattr(self, 'btn_switch_theme'):
+        if self.btn_switch_theme is not None:
             self.btn_switch_theme.config(text=self._get_theme_icon())
         
         # Update log colors if logger exists
-        if hasattr(self, 'logger') and self.logger:
-            from .logging_common import get_message_colors
+        if self.logger is not None:
             message_colors = get_message_colors(self._is_dark_theme())
             self.logger.update_theme_colors(message_colors)
             
             # Also update any existing message tag colors
-            if hasattr(self, 'txt_log'):
+            if self.txt_log is not None:
                 self.txt_log.tag_config("sent", background=message_colors["sent"])
                 self.txt_log.tag_config("received", background=message_colors["received"])
                 
-        # Update text widget theme (colors and font)
-        if hasattr(self, 'txt_log') and self.txt_log:
-            self._setup_text_widget_theme(self.txt_log)
+        # Update text widget colors (the font doesn't depend on the theme)
+        if self.txt_log is not None:
+            colors = self.style.colors
+            self.txt_log.configure(bg=colors.bg, fg=colors.fg)
             
-        # Call subclass-specific theme update if available
-        if hasattr(self, '_update_theme_specific'):
-            self._update_theme_specific()
+        # Subclass-specific theme updates
+        self._update_theme_specific()
+
+    def _update_theme_specific(self) -> None:
+        """Hook for subclass-specific updates after a theme switch (no-op by default)."""
+        pass
+
+    def _save_theme(self) -> None:
+        """Write the current theme to the config file (debounced from _switch_theme)."""
+        self._theme_save_job = None
+        self._config_executor.submit(self.theme_manager.save_theme, self.theme_manager.get_current_theme())
+
+    def _run_io(self, func: Callable, *args) -> None:
+        """
+        Run a blocking call (e.g. connect/disconnect) on the I/O worker so the
+        Tk thread stays responsive. Calls run one at a time, in submit order;
+        a raised exception is handled on the Tk thread by _on_io_failed.
+        """
+        self._io_executor.submit(func, *args).add_done_callback(self._on_io_done)
+
+    def _run_connect(self, func: Callable, *args) -> None:
+        """
+        Run a connect call on the I/O worker with all connection-dependent
+        widgets disabled until it succeeds (_on_mqtt_connect) or fails
+        (_on_io_failed), so it can't be queued twice.
+        """
+        self.root.tk.eval(self._state_scripts[None])
+        self._run_io(func, *args)
+
+    def _on_io_done(self, future) -> None:
+        """Done callback of _run_io (I/O worker thread)."""
+        exc = future.exception()
+        if exc is not None:
+            self._post_to_ui(self._on_io_failed, exc)
+
+    def _on_io_failed(self, exc: BaseException) -> None:
+        """
+        Log a failed I/O call and set the widgets back to the actual
+        connection state (e.g. re-enable the inputs after a connect timeout).
+        """
+        self._log(f"ERROR: {exc}")
+        self._set_connected(self.mqtt.connected)
 
     def _log(self, msg: str, **kwargs) -> None:
         """
@@ -128,6 +205,11 @@ class BaseApp(ABC):
         Start the Tkinter main loop.
         """
         self.root.mainloop()
+        # Don't lose a theme switch made right before closing the window
+        if self._theme_save_job is not None:
+            self._save_theme()
+        self._config_executor.shutdown(wait=True)
+        self._io_executor.shutdown(wait=True)
 
     # ─── Abstract Methods ────────────────────────────────────
     
@@ -154,19 +236,65 @@ class BaseApp(ABC):
 
     # ─── Common MQTT Callback Patterns ────────────────────────────────────
 
+    def _post_to_ui(self, func: Callable, *args) -> None:
+        """
+        Run func(*args) on the Tk thread: right away when already on it
+        (e.g. publish callbacks of button clicks), otherwise with the next
+        queue drain. Safe to call from the MQTT network thread (no Tcl calls involved).
+        """
+        if threading.get_ident() == self._ui_thread_id:
+            func(*args)
+        else:
+            self._ui_queue.put((func, args))
+
+    def _drain_ui_queue(self) -> None:
+        """
+        Run everything posted with _post_to_ui since the last drain, then reschedule.
+        """
+        ui_queue = self._ui_queue
+        try:
+            # Only take what is queued now, so a flood cannot starve the event loop
+            for _ in range(ui_queue.qsize()):
+                func, args = ui_queue.get_nowait()
+                func(*args)
+        finally:
+            self.root.after(self.UI_QUEUE_INTERVAL_MS, self._drain_ui_queue)
+
+    @staticmethod
+    def _build_state_scripts(input_widgets: tuple, nav_widgets: tuple) -> dict:
+        """
+        Build the Tcl scripts used by _set_connected, so a connection change
+        is a single eval. Uses the ttk state command, which flips the widget's
+        state flag directly instead of going through configure.
+        Args:
+            input_widgets: ttk widgets enabled while disconnected.
+            nav_widgets: ttk widgets enabled while connected.
+        Returns:
+            dict: {is_connected: script}, plus a None entry (connect in
+            progress) that disables both groups.
+        """
+        scripts = {}
+        for is_connected in (True, False, None):
+            state_input = "!disabled" if is_connected is False else "disabled"
+            state_nav = "!disabled" if is_connected else "disabled"
+            lines = [f"{w} state {state_input}" for w in input_widgets]
+            lines += [f"{w} state {state_nav}" for w in nav_widgets]
+            scripts[is_connected] = "\n".join(lines)
+        return scripts
+
     def _on_mqtt_connect(self) -> None:
         """
         Common MQTT callback: connected. Updates UI state.
         Subclasses can override for specific behavior.
         """
-        self.root.after(0, lambda: self._set_connected(True))
+        self._post_to_ui(self._set_connected, True)
 
     def _on_mqtt_disconnect(self) -> None:
         """
         Common MQTT callback: disconnected. Updates UI state.
         Subclasses can override for specific behavior.
         """
-        self.root.after(0, lambda: self._set_connected(False))
+        self._post_to_ui(self._set_connected, False)
 
     @abstractmethod
     def _set_connected(self, is_connected: bool) -> None:
@@ -186,16 +314,20 @@ def create_main_function(app_name: str, app_class, default_theme: str = "flatly"
         default_theme: Default theme if none specified.
     Returns:
         A main function that can be called or used as module entry point.
+        It parses sys.argv unless a dict of already parsed option overrides is given.
     """
-    def main():
+    def main(overrides: Optional[dict] = None):
         # Fixed config file path (relative to caller's file)
         import inspect
         caller_file = inspect.stack()[1].filename
         config_path = os.path.join(os.path.dirname(caller_file), 'mqtt_config.yaml')
         
-        # Create parser and validate arguments
-        parser = create_common_parser(app_name)
-        args = parser.parse_args()
+        # Parse arguments (unless already parsed by the caller) and validate them
+        if overrides is None:
+            parser = create_common_parser(app_name)
+            args = parser.parse_args()
+        else:
+            args = args_from_overrides(overrides)
         
         if not validate_args(args):
             return
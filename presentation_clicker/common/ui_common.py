@@ -2,10 +2,20 @@
 ui_common.py
 Shared UI utilities for Presentation Clicker.
 """
-import os
-import yaml
-from typing import List, Optional
-from ttkbootstrap import Style
+import types
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from .mqtt_config import load_mqtt_config, update_mqtt_config
+
+if TYPE_CHECKING:
+    from ttkbootstrap import Style
+
+# ITU-R BT.601 luma weights (scaled by 1000) used to tell dark from light themes
+_LUMA_R, _LUMA_G, _LUMA_B = 299, 587, 114
+_DARK_LUMA_THRESHOLD = 128 * 1000
+
+# Theme toggle icons (Segoe MDL2 Assets), indexed by "is the light theme active"
+_THEME_ICONS = ("\uE708", "\uE706")  # (moon, sun)
 
 class ThemeManager:
     """
@@ -24,9 +34,11 @@ class ThemeManager:
         self.theme_list = theme_list or ["flatly", "darkly"]
         self.theme_index = self.theme_list.index(initial_theme) if initial_theme in self.theme_list else 0
         self.config_path = config_path
-        self.style: Optional[Style] = None
+        self.style: Optional["Style"] = None
+        # is_dark_theme results keyed by background color
+        self._dark_cache: Dict[str, bool] = {}
     
-    def set_style(self, style: Style):
+    def set_style(self, style: "Style"):
         """Set the ttkbootstrap Style object."""
         self.style = style
     
@@ -39,46 +51,68 @@ class ThemeManager:
         if not self.style:
             return False
         bg = self.style.colors.bg
+        cached = self._dark_cache.get(bg)
+        if cached is not None:
+            return cached
+        result = False
         if bg.startswith("#") and len(bg) == 7:
-            r, g, b = int(bg[1:3], 16), int(bg[3:5], 16), int(bg[5:7], 16)
-            luminance = 0.299*r + 0.587*g + 0.114*b
-            return luminance < 128
-        return False
+            rgb = int(bg[1:7], 16)
+            r, g, b = rgb >> 16, (rgb >> 8) & 0xFF, rgb & 0xFF
+            result = _LUMA_R*r + _LUMA_G*g + _LUMA_B*b < _DARK_LUMA_THRESHOLD
+        self._dark_cache[bg] = result
+        return result
     
     def get_theme_icon(self) -> str:
         """Return the icon for the current theme using Segoe MDL2 Assets (E706 for sun, E708 for moon)."""
-        return "\uE706" if self.get_current_theme() == "flatly" else "\uE708"
+        return _THEME_ICONS[self.get_current_theme() == "flatly"]
     
-    def switch_theme(self):
-        """Switch to the next theme in the list and save to config."""
+    def switch_theme(self, save: bool = True):
+        """
+        Switch to the next theme in the list and save to config.
+        
+        Args:
+            save: Whether to write the new theme to the config file right away
+                (callers debouncing the write call save_theme() later).
+        """
         self.theme_index = (self.theme_index + 1) % len(self.theme_list)
         new_theme = self.get_current_theme()
         
-        if self.style:
+        # Only restyle if the theme actually changes
+        if self.style and self.style.theme.name != new_theme:
             self.style.theme_use(new_theme)
         
-        # Save theme to config
-        if self.config_path:
-            try:
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    config = yaml.safe_load(f)
-            except Exception:
-                config = {}
-            config['theme'] = new_theme
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                yaml.safe_dump(config, f)
-        
+        if save:
+            self.save_theme()
         return new_theme
+    
+    def save_theme(self, theme: Optional[str] = None) -> None:
+        """
+        Save a theme to the config file (if it differs from the saved one).
+        Goes through update_mqtt_config, the one writer of the config file.
+        
+        Args:
+            theme: Theme to save (defaults to the current theme).
+        """
+        if not self.config_path:
+            return
+        new_theme = theme or self.get_current_theme()
+        # load_mqtt_config is cached until the file changes on disk
+        if load_mqtt_config(self.config_path).get('theme') == new_theme:
+            return
+        update_mqtt_config(self.config_path, theme=new_theme)
+
+# Common icons using Segoe MDL2 Assets Unicode (read-only)
+_MISC_ICONS = types.MappingProxyType({
+    'copy': "\uE8C8",      # Copy
+    'generate': "\uE72C",  # Refresh
+    'paste': "\uE77F",     # Paste
+    'prev': "\uE100",      # Chevron Left
+    'next': "\uE101",      # Chevron Right
+    'start': "\uE768",     # Play
+    'end': "\uE71A",       # Stop
+    'blackout': "\uE890",  # View
+})
 
 def get_misc_icons():
-    """Return a dict of common icons using Segoe MDL2 Assets Unicode."""
-    return {
-        'copy': "\uE8C8",      # Copy
-        'generate': "\uE72C",  # Refresh
-        'paste': "\uE77F",     # Paste
-        'prev': "\uE100",      # Chevron Left
-        'next': "\uE101",      # Chevron Right
-        'start': "\uE768",     # Play
-        'end': "\uE71A",       # Stop
-        'blackout': "\uE890",  # View
-    }
+    """Return a read-only mapping of common icons using Segoe MDL2 Assets Unicode."""
+    return _MISC_ICONS
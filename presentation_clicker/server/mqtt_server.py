@@ -17,6 +17,8 @@ class PresentationMqttServer(BaseMqttHandler):
     MQTT server for Presentation Clicker system.
     Handles encrypted communication, reconnect logic, and UI callbacks.
     """
+    __slots__ = ()
+    
     def __init__(self, config_path: str = CONFIG_FILE) -> None:
         """
         Initialize the MQTT server and set default callbacks.
@@ -24,6 +26,8 @@ class PresentationMqttServer(BaseMqttHandler):
             config_path: Path to the MQTT config file.
         """
         super().__init__(config_path)
+        # Keep reconnect stalls short so no clicks are missed after an outage
+        self.client.reconnect_delay_set(min_delay=1, max_delay=8)
 
     def connect(self, room: str, pwd: str, timeout: int = 5) -> None:
         """
@@ -34,10 +38,12 @@ class PresentationMqttServer(BaseMqttHandler):
             timeout: Connection timeout in seconds.
         Raises:
             TimeoutError: If connection is not established within timeout.
+            RuntimeError: If already connected.
         """
+        # Don't touch the topics, keys or client of a live session
+        self._check_not_connected()
         # Store connection parameters
-        self.room = room
-        self.base_topic = self._get_base_topic()
+        self._set_room(room)
         self._setup_encryption(pwd)
         
         # Connect to broker
@@ -45,9 +51,11 @@ class PresentationMqttServer(BaseMqttHandler):
 
     # ─── Internal MQTT Callbacks ────────────────────────────────
     
-    def _on_connect_handler(self, client: mqtt.Client, userdata, flags, rc) -> None:
+    def _on_connect_handler(self, client: mqtt.Client, userdata, flags: mqtt.ConnectFlags, reason_code) -> None:
         """
         Server-specific connection handler.
-        Subscribes to all room topics.
+        Subscribes to all room topics. This also runs after automatic
+        reconnects (clean session, so the broker forgot the subscription),
+        which relies on _sub_filter staying set until the next connect().
         """
-        client.subscribe(f"{self.base_topic}/#")
+        client.subscribe(self._sub_filter)
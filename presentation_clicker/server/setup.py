@@ -5,7 +5,7 @@ setup(
     version='0.1.0',
     py_modules=['mqtt_server', 'ui_server'],
     install_requires=[
-        'paho-mqtt',
+        'paho-mqtt>=2.0.0',
         'cryptography',
         'ttkbootstrap',
         'keyboard',
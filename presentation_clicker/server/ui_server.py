@@ -3,29 +3,84 @@ ui_server.py
 Presentation Clicker Server UI using Tkinter and ttkbootstrap.
 Provides a user interface for managing room, users, permissions, and logs.
 """
-import datetime
-import json
+import functools
 import os
-import random
+import secrets
 import string
+import zlib
 import tkinter as tk
 from tkinter import ttk
-from typing import Optional, Any
+from typing import Optional, Any, Callable, Union
 
-import keyboard
 from .mqtt_server import PresentationMqttServer
 from ttkbootstrap import Style
 from ttkbootstrap.constants import PRIMARY, SUCCESS, DANGER
 from ..common import (
-    BaseApp, create_main_function, get_misc_icons, UILogger
+    BaseApp, create_main_function, get_misc_icons, UILogger, json_loads, as_text
 )
 
+# Presentation actions: action -> (required permission, key(s) to send)
+_ACTION_TABLE = {
+    "next":     ("nav", "right"),
+    "previous": ("nav", "left"),
+    "start":    ("control", ("shift", "f5")),
+    "end":      ("control", "esc"),
+    "blackout": ("control", "b"),
+}
+
+# Distinct user colors: light pastels for the light theme...
+_USER_COLORS_LIGHT = (
+    "#ffd6e0", # pink
+    "#ffe7c2", # peach
+    "#fffac2", # yellow
+    "#d6ffd6", # mint
+    "#c2f0ff", # blue
+    "#e0d6ff", # lavender
+    "#ffd6fa", # magenta
+    "#d6fff6", # aqua
+)
+# ...and darker versions of them for the dark theme
+_USER_COLORS_DARK = (
+    "#b85c6e", # dark pink
+    "#b88a4a", # dark peach
+    "#b8b04a", # dark yellow
+    "#4ab85c", # dark mint
+    "#4a8ab8", # dark blue
+    "#6e4ab8", # dark lavender
+    "#b84ab0", # dark magenta
+    "#4ab8b0", # dark aqua
+)
+# Treeview row tags, one per palette color (shared by all users with that color)
+_USER_ROW_TAGS = tuple(f"user_color_{i}" for i in range(len(_USER_COLORS_LIGHT)))
+
+
+@functools.lru_cache(maxsize=None)
+def _keyboard():
+    """
+    Import the keyboard library on first use (it is only needed to forward
+    actions, and hooks into the OS input system when loaded).
+    
+    Returns:
+        module: The keyboard module.
+    """
+    import keyboard
+    return keyboard
+
 
 class ServerListenerApp(BaseApp):
     """
     Presentation Clicker Server UI application.
     Handles room management, user permissions, MQTT communication, and log display.
     """
+    # Alphabets for generated room codes and passwords
+    _ROOM_ALPHABET = string.ascii_uppercase + string.digits
+    _PWD_ALPHABET = string.ascii_letters + string.digits
+    # Log lines for the outcome of a presentation action (% action, user)
+    _FMT_ALLOWED = "Action '%s' from '%s' allowed and executed."
+    _FMT_DENIED = "Action '%s' from '%s' denied (insufficient permissions)."
+    # Maximum number of detached rows kept for users who went offline
+    MAX_DETACHED_ROWS = 100
+    
     def __init__(self, mqtt_server: Optional[PresentationMqttServer] = None, theme: str = "flatly", config_path: str = None) -> None:
         """
         Initialize the UI, MQTT server, and callbacks.
@@ -38,6 +93,11 @@ class ServerListenerApp(BaseApp):
         
         self.connected_users: dict[str, Any] = {}
         self.mqtt: PresentationMqttServer = mqtt_server or PresentationMqttServer()
+        # Message handlers keyed by the last topic level
+        self._topic_handlers: dict[str, Callable[[dict, Union[str, bytes]], None]] = {
+            "status": self._handle_status,
+            "presentation": self._handle_presentation,
+        }
         self._setup_mqtt_callbacks()
         
         self._create_widgets()
@@ -56,11 +116,13 @@ class ServerListenerApp(BaseApp):
         self.mqtt.on_disconnect = self._on_mqtt_disconnect
         self.mqtt.on_message    = self._on_mqtt_message
 
-    def _create_widgets(self) -> None:
-        """Create all UI widgets."""
-        # Make Treeview headers bold
+    def _configure_theme_styles(self) -> None:
+        """Configure the custom ttk styles, including bold Treeview headers."""
+        super()._configure_theme_styles()
         self.style.configure("Treeview.Heading", font=("TkDefaultFont", 10, "bold"))
 
+    def _create_widgets(self) -> None:
+        """Create all UI widgets."""
         self.frm_top: ttk.Frame = ttk.Frame(self.root)
         self.frm_connect: ttk.LabelFrame = ttk.LabelFrame(
             self.frm_top, text="Connection",
@@ -68,12 +130,13 @@ class ServerListenerApp(BaseApp):
         self.lbl_room: ttk.Label = ttk.Label(self.frm_connect, text="Room Code:")
         self.ent_room: ttk.Entry = ttk.Entry(self.frm_connect, width=20)
         misc_icons = get_misc_icons()
-        self.btn_gen_room: ttk.Button = ttk.Button(self.frm_connect, text=misc_icons['generate'], width=4, command=self._generate_room, style="Icon.TButton")
-        self.btn_copy_room: ttk.Button = ttk.Button(self.frm_connect, text=misc_icons['copy'], width=4, command=lambda: self._copy_from_entry(self.ent_room), style="Icon.TButton")
+        icon_generate, icon_copy = misc_icons['generate'], misc_icons['copy']
+        self.btn_gen_room: ttk.Button = ttk.Button(self.frm_connect, text=icon_generate, width=4, command=self._generate_room, style="Icon.TButton")
+        self.btn_copy_room: ttk.Button = ttk.Button(self.frm_connect, text=icon_copy, width=4, command=lambda: self._copy_from_entry(self.ent_room), style="Icon.TButton")
         self.lbl_pwd: ttk.Label  = ttk.Label(self.frm_connect, text="Password:")
         self.ent_pwd: ttk.Entry  = ttk.Entry(self.frm_connect, width=20)
-        self.btn_gen_pwd: ttk.Button = ttk.Button(self.frm_connect, text=misc_icons['generate'], width=4, command=self._generate_pwd, style="Icon.TButton")
-        self.btn_copy_pwd: ttk.Button = ttk.Button(self.frm_connect, text=misc_icons['copy'], width=4, command=lambda: self._copy_from_entry(self.ent_pwd), style="Icon.TButton")
+        self.btn_gen_pwd: ttk.Button = ttk.Button(self.frm_connect, text=icon_generate, width=4, command=self._generate_pwd, style="Icon.TButton")
+        self.btn_copy_pwd: ttk.Button = ttk.Button(self.frm_connect, text=icon_copy, width=4, command=lambda: self._copy_from_entry(self.ent_pwd), style="Icon.TButton")
         self.frm_connect_btns: ttk.Frame = ttk.Frame(self.frm_connect)
         self.btn_connect: ttk.Button = ttk.Button(
             self.frm_connect_btns, text="Connect", bootstyle="success-outline",
@@ -81,11 +144,17 @@ class ServerListenerApp(BaseApp):
         self.btn_disconnect: ttk.Button = ttk.Button(
             self.frm_connect_btns, text="Disconnect", bootstyle="danger-outline",
             width=15, state=tk.DISABLED, command=self.on_disconnect)
-        self.style.configure("Treeview.Heading")
         self.frm_users: ttk.LabelFrame = ttk.LabelFrame(
             self.frm_top, text="Connected Users",
             padding=(10,10), bootstyle="secondary")
         self.user_rows: dict[str, dict[str, Any]] = {}
+        # Reverse lookup for clicks on the Treeview (item id -> user)
+        self._iid_to_user: dict[str, str] = {}
+        # Rows of users that went offline, detached from the tree so they can be
+        # reattached when the user comes back (oldest first)
+        self._detached_rows: dict[str, dict[str, Any]] = {}
+        # Palette index per user (the same in both themes)
+        self._user_color_index: dict[str, int] = {}
         self.tree_users: ttk.Treeview = ttk.Treeview(self.frm_users, columns=("name", "nav", "control"), show="headings", height=10)
         self.tree_users.heading("name", text="User", anchor=tk.W)
         self.tree_users.heading("nav", text="Navigation", anchor=tk.CENTER)
@@ -96,6 +165,7 @@ class ServerListenerApp(BaseApp):
         self.scr_users: ttk.Scrollbar = ttk.Scrollbar(self.frm_users, orient=tk.VERTICAL, command=self.tree_users.yview)
         self.tree_users.configure(yscrollcommand=self.scr_users.set)
         self.tree_users.bind('<Button-1>', self.on_treeview_click)
+        self._configure_user_row_tags()
         self.frm_bottom: ttk.Frame = ttk.Frame(self.root, padding=(5))
         self.frm_log: ttk.LabelFrame = ttk.LabelFrame(
             self.frm_bottom, text="Log", padding=(10,10), bootstyle="secondary")
@@ -110,6 +180,13 @@ class ServerListenerApp(BaseApp):
         self.btn_switch_theme: ttk.Button = ttk.Button(
             self.frm_connect, text=self._get_theme_icon(), width=3, 
             style="Icon.TButton", command=self._switch_theme)
+        # Widgets toggled by _set_connected: inputs are enabled while disconnected,
+        # the disconnect button while connected
+        self._input_widgets = (
+            self.ent_room, self.ent_pwd, self.btn_gen_room, self.btn_gen_pwd,
+            self.btn_connect)
+        self._nav_widgets = (self.btn_disconnect,)
+        self._state_scripts = self._build_state_scripts(self._input_widgets, self._nav_widgets)
 
     def _layout_widgets(self) -> None:
         """Lay out all widgets in the UI."""
@@ -200,174 +277,145 @@ class ServerListenerApp(BaseApp):
             self._log("ERROR: Room code and password required.")
             return
         self._log(f"Connecting as server for room '{room}'…")
-        try:
-            self.mqtt.connect(room, pwd)
-        except TimeoutError as e:
-            self._log(f"ERROR: {e}")
+        # Key derivation and the CONNACK wait block for up to the timeout
+        self._run_connect(self.mqtt.connect, room, pwd)
 
     def on_disconnect(self) -> None:
         """Handle disconnect button click. Disconnects from MQTT."""
         self._log("Disconnecting server…")
-        self.mqtt.disconnect()
+        self._run_io(self.mqtt.disconnect)
 
     def on_treeview_click(self, event: Any) -> None:
         """Handle clicks on the Treeview. Toggle permissions for users."""
-        # Check if click is in a cell region
-        region = self.tree_users.identify('region', event.x, event.y)
-        if region != 'cell':
+        # Only the permission columns are clickable, check those first
+        col = self.tree_users.identify_column(event.x)
+        if col not in ('#2', '#3'):
             return
-            
-        # Get the row and column
+        # Get the row (empty for the headings and the blank area below the rows)
         rowid = self.tree_users.identify_row(event.y)
-        col = self.tree_users.identify_column(event.x)
-        if not rowid or col not in ('#2', '#3'):
+        if not rowid:
             return
             
         # Get the username
-        user = self.tree_users.item(rowid, 'values')[0]
-        if user not in self.user_rows:
+        user = self._iid_to_user.get(rowid)
+        user_data = self.user_rows.get(user)
+        if user_data is None:
             return
             
-        # Toggle the appropriate permission
-        if col == '#2':  # Navigation column
-            self.user_rows[user]["nav"] = not self.user_rows[user]["nav"]
-        elif col == '#3':  # Control column
-            self.user_rows[user]["control"] = not self.user_rows[user]["control"]
+        # Toggle the appropriate permission (#2: navigation, #3: control)
+        column = "nav" if col == '#2' else "control"
+        user_data[column] = not user_data[column]
             
         # Update the display and log the change
-        self._update_user_display(user)
-        self._log(f"Permission changed for {user}: nav={self.user_rows[user]['nav']}, control={self.user_rows[user]['control']}")
+        self._update_user_cell(user, column)
+        self._log(f"Permission changed for {user}: nav={user_data['nav']}, control={user_data['control']}")
 
     # MQTT callbacks
     def _on_mqtt_connect(self) -> None:
         """MQTT callback: connected. Enables/disables UI elements."""
-        def update_ui():
-            self._set_connected(True)
-            host = self.mqtt.config.get('host', 'unknown')
-            port = self.mqtt.config.get('port', 'unknown')
-            self._set_title_with_server(f"MQTT: {host}:{port}")
-            self._log("Connected ✅")
-        self.root.after(0, update_ui)
+        self._post_to_ui(self._show_connected)
 
     def _on_mqtt_disconnect(self) -> None:
         """MQTT callback: disconnected. Enables/disables UI elements."""
-        def update_ui():
-            self._set_connected(False)
-            self.root.title("Presentation Clicker Server")
-            self._log("Disconnected ❌")
-        self.root.after(0, update_ui)
+        self._post_to_ui(self._show_disconnected)
 
-    def _on_mqtt_message(self, topic: str, payload: str) -> None:
-        """MQTT callback: message received. Handles user status and actions."""
-        self.root.after(0, lambda: self._handle_message(topic, payload))
+    def _show_connected(self) -> None:
+        """Update the UI after connecting (Tk thread)."""
+        self._set_connected(True)
+        host = self.mqtt.config.get('host', 'unknown')
+        port = self.mqtt.config.get('port', 'unknown')
+        self._set_title_with_server(f"MQTT: {host}:{port}")
+        self._log("Connected ✅")
 
-    def _handle_message(self, topic: str, payload: str) -> None:
-        """Handle incoming MQTT messages for user status and presentation actions."""
+    def _show_disconnected(self) -> None:
+        """Update the UI after disconnecting (Tk thread)."""
+        self._set_connected(False)
+        self.root.title("Presentation Clicker Server")
+        self._log("Disconnected ❌")
+
+    def _on_mqtt_message(self, topic: str, payload: Union[str, bytes]) -> None:
+        """
+        MQTT callback: message received. Handles user status and actions.
+        The JSON is parsed here on the MQTT network thread, the Tk thread
+        only gets the parsed data (None if the payload isn't valid JSON).
+        """
         try:
-            data = json.loads(payload)
-        except Exception:
-            self._log(f"Malformed message: {payload}")
+            data = json_loads(payload)
+        except ValueError:
+            data = None
+        self._post_to_ui(self._handle_message, topic, data, payload)
+
+    def _handle_message(self, topic: str, data: Optional[Any], payload: Union[str, bytes]) -> None:
+        """Handle incoming MQTT messages for user status and presentation actions."""
+        if data is None:
+            self._log(f"Malformed message: {as_text(payload)}")
             return
-        if topic.endswith("/status"):
-            user = data.get("user")
-            status = data.get("status")
-            if status == "online":
-                self._update_user(user, nav=True, control=False)
-                self._log(f"User '{user}' is now online.", user=user)
-            elif status == "offline":
-                if user in self.user_rows:
-                    self.tree_users.delete(self.user_rows[user]["iid"])
-                    del self.user_rows[user]
-                self._log(f"User '{user}' is now offline.", user=user)
-            elif status == "connection_lost":
-                if user in self.user_rows:
-                    self.tree_users.delete(self.user_rows[user]["iid"])
-                    del self.user_rows[user]
-                self._log(f"User '{user}' connection lost.", user=user)
-        elif topic.endswith("/presentation"):
-            user = data.get("user")
-            action = data.get("action")
-            if user and action:
-                # Check user permissions before executing action
-                perms = self.user_rows.get(user, {})
-                allowed = False
-                
-                # Check navigation permissions (next, previous)
-                if action in ("next", "previous") and perms.get("nav"):
-                    allowed = True
-                    if action == "next":
-                        keyboard.send("right")
-                    elif action == "previous":
-                        keyboard.send("left")
-                        
-                # Check control permissions (start, end, blackout)
-                elif action in ("start", "end", "blackout") and perms.get("control"):
-                    allowed = True
-                    if action == "start":
-                        keyboard.send(['shift', 'f5'])
-                    elif action == "end":
-                        keyboard.send("esc")
-                    elif action == "blackout":
-                        keyboard.send("b")
-                
-                # Log the result
-                if allowed:
-                    self._log(f"Action '{action}' from '{user}' allowed and executed.", user=user)
-                else:
-                    self._log(f"Action '{action}' from '{user}' denied (insufficient permissions).", user=user)
+        # Dispatch on the last topic level ('status' or 'presentation')
+        handler = self._topic_handlers.get(topic.rpartition("/")[2])
+        if handler is not None:
+            handler(data, payload)
+
+    def _handle_status(self, data: dict, payload: Union[str, bytes]) -> None:
+        """
+        Handle a user status message (online/offline/connection lost).
+        Offline messages for users not in the list are ignored; these are
+        mostly the retained statuses of users who left before we connected.
+        """
+        user = data.get("user")
+        status = data.get("status")
+        if status in ("offline", "connection_lost") and user not in self.user_rows:
+            return
+        if status == "online":
+            self._update_user(user, nav=True, control=False)
+            self._log(f"User '{user}' is now online.", user=user)
+        elif status == "offline":
+            self._remove_user(user)
+            self._log(f"User '{user}' is now offline.", user=user)
+        elif status == "connection_lost":
+            self._remove_user(user)
+            self._log(f"User '{user}' connection lost.", user=user)
+
+    def _handle_presentation(self, data: dict, payload: Union[str, bytes]) -> None:
+        """Handle a presentation action, if the sending user is allowed to perform it."""
+        user = data.get("user")
+        action = data.get("action")
+        if user and action:
+            # Check user permissions before executing action
+            perms = self.user_rows.get(user)
+            entry = _ACTION_TABLE.get(action)
+            if entry is not None and perms is not None and perms[entry[0]]:
+                _keyboard().send(entry[1])
+                self._log(self._FMT_ALLOWED % (action, user), user=user)
             else:
-                self._log(f"Malformed action message: {payload}")
+                self._log(self._FMT_DENIED % (action, user), user=user)
+        else:
+            self._log(f"Malformed action message: {as_text(payload)}")
 
     def _set_connected(self, is_connected: bool) -> None:
-        """Enable/disable UI elements based on connection state."""
-        state_input = tk.DISABLED if is_connected else tk.NORMAL
-        state_conn = tk.DISABLED if is_connected else tk.NORMAL
-        state_disconn = tk.NORMAL if is_connected else tk.DISABLED
-        
-        # Disable/enable input fields
-        self.ent_room.config(state=state_input)
-        self.ent_pwd.config(state=state_input)
-        
-        # Disable/enable generation and copy buttons
-        self.btn_gen_room.config(state=state_input)
-        self.btn_gen_pwd.config(state=state_input)
-        
-        # Disable/enable connection buttons
-        self.btn_connect.config(state=state_conn)
-        self.btn_disconnect.config(state=state_disconn)
-
-    def _get_user_colors(self):
-        """Return a list of distinct colors for users, responsive to theme."""
-        # Light pastel colors for light theme
-        pastel_light = [
-            "#ffd6e0", # pink
-            "#ffe7c2", # peach
-            "#fffac2", # yellow
-            "#d6ffd6", # mint
-            "#c2f0ff", # blue
-            "#e0d6ff", # lavender
-            "#ffd6fa", # magenta
-            "#d6fff6"  # aqua
-        ]
-        # Darker versions for dark theme
-        pastel_dark = [
-            "#b85c6e", # dark pink
-            "#b88a4a", # dark peach
-            "#b8b04a", # dark yellow
-            "#4ab85c", # dark mint
-            "#4a8ab8", # dark blue
-            "#6e4ab8", # dark lavender
-            "#b84ab0", # dark magenta
-            "#4ab8b0"  # dark aqua
-        ]
-        return pastel_dark if self._is_dark_theme() else pastel_light
+        """Enable/disable UI elements based on connection state (one Tcl eval)."""
+        self.root.tk.eval(self._state_scripts[is_connected])
+
+    def _get_user_colors(self) -> tuple:
+        """Return the distinct user colors for the current theme."""
+        return _USER_COLORS_DARK if self._is_dark_theme() else _USER_COLORS_LIGHT
 
     def _get_user_color(self, user: str) -> str:
         """Get a consistent color for a user based on their name hash."""
         if not user:
             return "#888888"
-        colors = self._get_user_colors()
-        return colors[hash(user) % len(colors)]
+        return self._get_user_colors()[self._get_user_color_index(user)]
+
+    def _get_user_color_index(self, user: str) -> int:
+        """
+        Return the user's palette index (the same in both themes).
+        Based on a CRC of the name rather than hash(), which is salted per
+        process, so users keep their color across restarts.
+        """
+        index = self._user_color_index.get(user)
+        if index is None:
+            index = zlib.crc32(user.encode()) % len(_USER_COLORS_LIGHT)
+            self._user_color_index[user] = index
+        return index
 
     def _update_user(self, user: str, nav: bool = True, control: bool = False) -> None:
         """Add or update a user in the connected users list with background color."""
@@ -377,56 +425,82 @@ class ServerListenerApp(BaseApp):
         # Create colored row with tag
         nav_text = "✔" if nav else "✖"
         control_text = "✔" if control else "✖"
-        user_color = self._get_user_color(user)
-        tag_name = f"user_{user}"
-        
-        # Configure tag with user color
-        self.tree_users.tag_configure(tag_name, background=user_color)
-        
-        # Insert row with tag
-        iid = self.tree_users.insert("", tk.END, values=(user, nav_text, control_text), tags=(tag_name,))
+        user_data = self._detached_rows.pop(user, None)
+        if user_data is not None:
+            # Returning user: reattach the old row with fresh permissions
+            iid = user_data["iid"]
+            self.tree_users.item(iid, values=(user, nav_text, control_text))
+            self.tree_users.move(iid, "", tk.END)
+        else:
+            # Insert row with the tag of the user's palette color
+            tag_name = _USER_ROW_TAGS[self._get_user_color_index(user)]
+            iid = self.tree_users.insert("", tk.END, values=(user, nav_text, control_text), tags=(tag_name,))
+            self._iid_to_user[iid] = user
         self.user_rows[user] = {"iid": iid, "nav": nav, "control": control}
 
-    def _update_user_display(self, user: str) -> None:
-        """Update the display for a specific user with color preservation."""
+    def _configure_user_row_tags(self) -> None:
+        """Set the background of the user row tags to the current theme's palette."""
+        for tag_name, color in zip(_USER_ROW_TAGS, self._get_user_colors()):
+            self.tree_users.tag_configure(tag_name, background=color)
+
+    def _remove_user(self, user: str) -> None:
+        """
+        Remove a user from the connected users list (if present).
+        The row is only detached, so it can be reused if the user comes back.
+        """
+        user_data = self.user_rows.pop(user, None)
+        if user_data is None:
+            return
+        self.tree_users.detach(user_data["iid"])
+        self._detached_rows[user] = user_data
+        # Drop the rows of users who have been gone the longest
+        while len(self._detached_rows) > self.MAX_DETACHED_ROWS:
+            old_data = self._detached_rows.pop(next(iter(self._detached_rows)))
+            self.tree_users.delete(old_data["iid"])
+            del self._iid_to_user[old_data["iid"]]
+
+    def _update_user_cell(self, user: str, column: str) -> None:
+        """
+        Update a single permission cell of a user's row.
+        Only that cell is set, so the row keeps its values and color tag.
+        Args:
+            user: User name.
+            column: Permission column ('nav' or 'control').
+        """
         if user not in self.user_rows:
             return
         user_data = self.user_rows[user]
-        nav_text = "✔" if user_data["nav"] else "✖"
-        control_text = "✔" if user_data["control"] else "✖"
-        
-        # Preserve the tag for background color
-        tag_name = f"user_{user}"
-        self.tree_users.item(user_data["iid"], values=(user, nav_text, control_text), tags=(tag_name,))
+        self.tree_users.set(user_data["iid"], column, "✔" if user_data[column] else "✖")
 
     def _generate_room(self) -> None:
         """Generate a random room code."""
-        room = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+        room = ''.join(secrets.choice(self._ROOM_ALPHABET) for _ in range(6))
         self.ent_room.delete(0, tk.END)
         self.ent_room.insert(0, room)
 
     def _generate_pwd(self) -> None:
         """Generate a random password."""
-        pwd = ''.join(random.choices(string.ascii_letters + string.digits, k=10))
+        pwd = ''.join(secrets.choice(self._PWD_ALPHABET) for _ in range(10))
         self.ent_pwd.delete(0, tk.END)
         self.ent_pwd.insert(0, pwd)
 
     def _copy_from_entry(self, entry: ttk.Entry) -> None:
-        """Copy text from an entry widget to clipboard."""
-        text = entry.get()
+        """
+        Copy text from an entry widget to clipboard.
+        The clipboard is updated once Tk is idle, so the button's click
+        feedback isn't held up by a slow selection handover (e.g. on X11).
+        """
+        self.root.after_idle(self._set_clipboard, entry.get())
+
+    def _set_clipboard(self, text: str) -> None:
+        """Replace the clipboard content with text."""
         self.root.clipboard_clear()
         self.root.clipboard_append(text)
 
     def _update_theme_specific(self) -> None:
         """Update theme-specific elements when theme changes."""
         # Update user row colors for new theme
-        for user in self.user_rows:
-            tag_name = f"user_{user}"
-            user_color = self._get_user_color(user)
-            self.tree_users.tag_configure(tag_name, background=user_color)
-        
-        # Re-apply bold font for Treeview headers (may be needed after theme change)
-        self.style.configure("Treeview.Heading", font=("TkDefaultFont", 10, "bold"))
+        self._configure_user_row_tags()
 
 
 # Create main function using the factory
@@ -0,0 +1,74 @@
+"""
+test_encryption.py
+Tests for the shared Fernet helpers, with cryptography's Fernet and the optional rfernet backend.
+"""
+import pytest
+from cryptography.fernet import Fernet, InvalidToken
+
+from presentation_clicker.common import encryption
+from presentation_clicker.common.encryption import get_fernet, DECRYPT_ERRORS
+
+PWD = "test-password"
+PAYLOAD = b'{"action":"next","user":"alice"}'
+BAD_TOKENS = [b"garbage", b"\xff\xfe not ascii"]
+
+needs_rfernet = pytest.mark.skipif(encryption.rfernet is None, reason="rfernet not installed")
+
+
+@pytest.fixture
+def cryptography_backend(monkeypatch):
+    """Make get_fernet use cryptography's Fernet even when rfernet is installed."""
+    monkeypatch.setattr(encryption, "rfernet", None)
+
+
+def test_decrypt_errors_contains_invalid_token():
+    assert InvalidToken in DECRYPT_ERRORS
+
+
+def test_cryptography_round_trips_bytes(cryptography_backend):
+    fernet = get_fernet(PWD)
+    assert isinstance(fernet, Fernet)
+    token = fernet.encrypt(PAYLOAD)
+    assert isinstance(token, bytes)
+    assert fernet.decrypt(token) == PAYLOAD
+
+
+@pytest.mark.parametrize("token", BAD_TOKENS)
+def test_cryptography_invalid_token_raises_invalid_token(cryptography_backend, token):
+    with pytest.raises(InvalidToken):
+        get_fernet(PWD).decrypt(token)
+
+
+@needs_rfernet
+def test_get_fernet_uses_rfernet_adapter():
+    assert isinstance(get_fernet(PWD), encryption._RFernet)
+
+
+@needs_rfernet
+def test_rfernet_round_trips_bytes():
+    fernet = get_fernet(PWD)
+    token = fernet.encrypt(PAYLOAD)
+    assert isinstance(token, bytes)
+    assert fernet.decrypt(token) == PAYLOAD
+
+
+@needs_rfernet
+def test_rfernet_tokens_interoperate_with_cryptography():
+    fernet = get_fernet(PWD)
+    reference = Fernet(encryption._derive_key(PWD, encryption.SALT))
+    assert reference.decrypt(fernet.encrypt(b"next")) == b"next"
+    assert fernet.decrypt(reference.encrypt(b"previous")) == b"previous"
+
+
+@needs_rfernet
+@pytest.mark.parametrize("token", BAD_TOKENS + ["garbage"])
+def test_rfernet_invalid_token_raises_invalid_token(token):
+    with pytest.raises(InvalidToken):
+        get_fernet(PWD).decrypt(token)
+
+
+def test_clear_key_cache_drops_derived_keys():
+    get_fernet(PWD)
+    assert encryption._derive_key.cache_info().currsize > 0
+    encryption.clear_key_cache()
+    assert encryption._derive_key.cache_info().currsize == 0